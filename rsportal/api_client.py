@@ -0,0 +1,222 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import get_api_base, get_authed_session, get_basic_auth
+
+# keep-alive pool shared by every pull and push; sized for the concurrent
+# comment fetch plus a few foreground requests
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+DEFAULT_TIMEOUT = 30
+# lifetime assumed for a Django login whose session cookie carries no expiry
+SESSION_TTL = timedelta(hours=12)
+
+
+class ApiClient:
+    """One pooled HTTP session for all traffic to the RSportal API.
+
+    Owns a keep-alive ``requests.Session`` (so TCP/TLS handshakes are reused)
+    and resolves authentication once, in this order:
+
+    - ``basic``: credentials saved in the sqlite ``auth`` table
+    - ``session``: Django session cookies for the keyring user, restored from
+      app storage when still valid, otherwise from a fresh login (then stored)
+    - ``keyring``: HTTP Basic with the keyring user when the login page is unavailable
+
+    Call :meth:`reset_auth` when the saved credentials change.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_maxsize: int = POOL_MAXSIZE,
+        timeout: int = DEFAULT_TIMEOUT,
+    ):
+        self.base_url = (base_url or get_api_base()).rstrip("/")
+        self.timeout = timeout
+        self.auth_mode: Optional[str] = None
+        self._lock = threading.Lock()
+        # bumped whenever the session cookies are replaced, so that threads
+        # rejected on the same stale session log in only once
+        self._generation = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+        )
+
+    def url(self, path: str) -> str:
+        # absolute URLs (e.g. pagination ``next`` links) are used as given
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _ensure_auth(self) -> None:
+        if self.auth_mode is not None:
+            return
+        with self._lock:
+            if self.auth_mode is not None:
+                return
+            # imported here: storage_sqlite builds on this module
+            from rsportal.storage_sqlite import get_saved_auth
+
+            saved = get_saved_auth()
+            if saved:
+                self.session.auth = (saved.get("username"), saved.get("password"))
+                self.auth_mode = "basic"
+            elif self._restore_session() or self._login_session():
+                self.auth_mode = "session"
+            else:
+                auth = get_basic_auth()
+                self.session.auth = auth if all(auth) else None
+                self.auth_mode = "keyring" if all(auth) else "anonymous"
+
+    def _restore_session(self) -> bool:
+        """Load a stored, unexpired login session for the keyring user."""
+        from rsportal.storage_sqlite import get_http_session
+
+        username, _ = get_basic_auth()
+        stored = get_http_session(username) if username else None
+        if not stored:
+            return False
+        for c in stored["cookies"]:
+            self.session.cookies.set(
+                c["name"],
+                c["value"],
+                domain=c.get("domain") or "",
+                path=c.get("path") or "/",
+                expires=c.get("expires"),
+                secure=bool(c.get("secure")),
+            )
+        return True
+
+    def _login_session(self) -> bool:
+        """Log in through the Django login view and persist the resulting cookies."""
+        from rsportal.storage_sqlite import save_http_session
+
+        username, _ = get_basic_auth()
+        if not username or get_authed_session(self.session) is None:
+            return False
+        cookies = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+                "secure": c.secure,
+            }
+            for c in self.session.cookies
+        ]
+        self._generation += 1
+        expires = datetime.utcnow() + SESSION_TTL
+        for c in self.session.cookies:
+            if c.name == "sessionid" and c.expires:
+                expires = min(expires, datetime.utcfromtimestamp(c.expires))
+        save_http_session(
+            username,
+            cookies,
+            self.session.cookies.get("csrftoken"),
+            expires.isoformat(),
+        )
+        return True
+
+    def _refresh_session(self, generation: int) -> bool:
+        """Drop a rejected session and log in again (once per rejection).
+
+        ``generation`` is the session the rejected request was sent on; when
+        another thread has replaced it since, the request is only retried.
+        """
+        from rsportal.storage_sqlite import clear_http_session
+
+        with self._lock:
+            if self._generation != generation:
+                return self.auth_mode == "session"
+            clear_http_session()
+            self.session.cookies.clear()
+            if self._login_session():
+                return True
+            self.auth_mode = None
+            return False
+
+    def reset_auth(self) -> None:
+        """Forget the resolved credentials; the next request resolves them again."""
+        with self._lock:
+            self.session.auth = None
+            self.session.cookies.clear()
+            self.auth_mode = None
+            self._generation += 1
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        self._ensure_auth()
+        generation = self._generation
+        kwargs.setdefault("timeout", self.timeout)
+        if self.auth_mode == "session" and method.upper() not in ("GET", "HEAD"):
+            # Django rejects unsafe session-authenticated requests without CSRF
+            csrftoken = self.session.cookies.get("csrftoken")
+            if csrftoken:
+                headers = dict(kwargs.pop("headers", None) or {})
+                headers.setdefault("X-CSRFToken", csrftoken)
+                headers.setdefault("Referer", self.base_url)
+                kwargs["headers"] = headers
+        resp = self.session.request(method, self.url(path), **kwargs)
+        if (
+            self.auth_mode == "session"
+            and resp.status_code in (401, 403)
+            and self._refresh_session(generation)
+        ):
+            # the stored session expired server-side: retry once on the new one
+            headers = kwargs.get("headers")
+            if headers and "X-CSRFToken" in headers:
+                headers["X-CSRFToken"] = self.session.cookies.get("csrftoken")
+            resp = self.session.request(method, self.url(path), **kwargs)
+        return resp
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def check_credentials(self, username: str, password: str) -> bool:
+        """Probe ``/auth/check`` with explicit credentials over the pooled session."""
+        resp = self.session.get(
+            self.url("/auth/check"),
+            auth=(username, password),
+            timeout=self.timeout,
+        )
+        return resp.status_code in (200, 204)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[ApiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ApiClient:
+    """Return the process-wide API client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ApiClient()
+    return _client
+
+
+def reset_client() -> None:
+    """Close the shared client (e.g. after the base URL changed)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
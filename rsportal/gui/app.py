@@ -4,6 +4,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from rsportal.gui.home_view import HomeView
 from rsportal import storage_sqlite
+from rsportal.api_client import reset_client
+from rsportal.storage_worker import get_storage_worker, stop_storage_worker
+from rsportal.sync import SyncScheduler
+from rsportal.task_index import get_task_index
 from utils import is_authenticated
 
 # Ensure project root is on sys.path so absolute imports work when running this file directly
@@ -14,12 +18,19 @@ if _PROJECT_ROOT not in sys.path:
 
 
 def run_app():
-    storage_sqlite.init_db()
+    # apply pending schema migrations once; the views never touch DDL
+    storage_sqlite.migrate()
+    # the quick-open (Ctrl+P) index is built once here and then kept
+    # current by every task upsert
+    get_task_index()
 
     root = tk.Tk()
     root.title("RSportal — Tasks")
     root.geometry("900x600")
 
+    # GUI writes run on the storage worker; their callbacks come back to Tk
+    get_storage_worker().dispatch = lambda fn: root.after(0, fn)
+
     if not is_authenticated():
         messagebox.showinfo(
             "Authentication",
@@ -29,16 +40,33 @@ def run_app():
     container = ttk.Frame(root)
     container.pack(fill="both", expand=True)
 
-    app = HomeView(container, root)
+    # background push/pull; results are applied on the Tk thread
+    scheduler = SyncScheduler(
+        on_complete=lambda kind, result: root.after(
+            0, lambda: app.on_background_sync(kind, result)
+        )
+    )
+    app = HomeView(container, root, scheduler=scheduler)
     app.pack(fill="both", expand=True)
+    scheduler.start()
 
     # on close: ensure running timers are stopped
     def on_close():
-        # stop any running entries by setting end_time to now
+        scheduler.stop()
+        # stop any running entries by setting end_time to now (after the
+        # writes still queued, so a just-started timer is stopped too)
+        worker = get_storage_worker()
+        # the windows are going away: drop their callbacks
+        worker.dispatch = lambda fn: None
         try:
-            storage_sqlite.stop_running_entries_and_get()
+            worker.submit(storage_sqlite.stop_running_entries_and_get).result(
+                timeout=10
+            )
         except Exception:
             pass
+        stop_storage_worker(timeout=10)
+        storage_sqlite.close_connections()
+        reset_client()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_close)
@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import requests
-from utils import get_api_base
 from rsportal import storage_sqlite
+from rsportal.api_client import get_client
+from rsportal.storage_worker import get_storage_worker
 
 
 class AuthDialog(tk.Toplevel):
@@ -30,8 +30,8 @@ class AuthDialog(tk.Toplevel):
 
         btn_frame = ttk.Frame(frm)
         btn_frame.grid(row=2, column=0, columnspan=2, pady=(12, 0))
-        login_btn = ttk.Button(btn_frame, text="Login", command=self.attempt_login)
-        login_btn.pack(side="left")
+        self.login_btn = ttk.Button(btn_frame, text="Login", command=self.attempt_login)
+        self.login_btn.pack(side="left")
         cancel_btn = ttk.Button(btn_frame, text="Cancel", command=self.close)
         cancel_btn.pack(side="left", padx=(8, 0))
 
@@ -53,22 +53,39 @@ class AuthDialog(tk.Toplevel):
         if not username or not password:
             messagebox.showwarning("Missing", "Please enter username and password")
             return
-        base = get_api_base()
-        url = f"{base}/auth/check"
-        try:
-            resp = requests.get(url, auth=(username, password), timeout=10)
-            if resp.status_code in (200, 204):
-                # save into sqlite; do not overwrite existing active auth unless user logs out explicitly
-                saved_ok = storage_sqlite.save_auth(username, password, force=False)
-                if not saved_ok:
-                    messagebox.showinfo("Already logged in", "An active credential already exists. Please logout first if you want to replace it.")
-                    return
-                messagebox.showinfo("Success", "Logged in and credentials saved locally.")
+
+        def _login():
+            # runs on the storage worker: the credential check and the write
+            # stay off the Tk thread
+            if not get_client().check_credentials(username, password):
+                return "invalid"
+            # do not overwrite existing active auth unless user logs out explicitly
+            if not storage_sqlite.save_auth(username, password, force=False):
+                return "exists"
+            return "saved"
+
+        def _done(outcome):
+            if not self.winfo_exists():
+                # cancelled while the login was in flight
+                if outcome == "saved" and callable(self.on_success):
+                    self.on_success()
+                return
+            self.login_btn.config(state="normal")
+            if outcome == "invalid":
+                messagebox.showerror("Invalid", "Invalid credentials or server did not accept the login.", parent=self)
+            elif outcome == "exists":
+                messagebox.showinfo("Already logged in", "An active credential already exists. Please logout first if you want to replace it.", parent=self)
+            else:
+                messagebox.showinfo("Success", "Logged in and credentials saved locally.", parent=self)
                 if callable(self.on_success):
                     self.on_success()
                 self.close()
+
+        def _failed(e):
+            if not self.winfo_exists():
                 return
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to verify credentials: {e}")
-            return
-        messagebox.showerror("Invalid", "Invalid credentials or server did not accept the login.")
+            self.login_btn.config(state="normal")
+            messagebox.showerror("Error", f"Failed to verify credentials: {e}", parent=self)
+
+        self.login_btn.config(state="disabled")
+        get_storage_worker().submit(_login, on_success=_done, on_error=_failed)
@@ -0,0 +1,101 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from rsportal import storage_sqlite
+from rsportal.storage_worker import get_storage_worker
+
+
+class DeadLetterDialog(tk.Toplevel):
+    """List local changes the server rejected permanently, with Retry/Discard."""
+
+    def __init__(self, parent, on_change=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.on_change = on_change
+        self.title("Failed pushes")
+        self.geometry("760x320")
+        self.transient(parent)
+
+        frm = ttk.Frame(self, padding=8)
+        frm.pack(fill="both", expand=True)
+
+        cols = ("entity", "entity_id", "error", "attempts", "created_at")
+        self.tree = ttk.Treeview(frm, columns=cols, show="headings", selectmode="extended")
+        self.tree.heading("entity", text="Type")
+        self.tree.heading("entity_id", text="ID")
+        self.tree.heading("error", text="Error")
+        self.tree.heading("attempts", text="Attempts")
+        self.tree.heading("created_at", text="Failed at")
+        self.tree.column("entity", width=100)
+        self.tree.column("entity_id", width=70, anchor="center")
+        self.tree.column("error", width=360)
+        self.tree.column("attempts", width=70, anchor="center")
+        self.tree.column("created_at", width=140)
+        self.tree.pack(fill="both", expand=True)
+
+        btn_frame = ttk.Frame(frm)
+        btn_frame.pack(fill="x", pady=(8, 0))
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right")
+        ttk.Button(btn_frame, text="Discard", command=self.discard_selected).pack(
+            side="right", padx=(0, 8)
+        )
+        ttk.Button(btn_frame, text="Retry", command=self.retry_selected).pack(
+            side="right", padx=(0, 8)
+        )
+
+        self.load()
+
+    def load(self):
+        for iid in self.tree.get_children():
+            self.tree.delete(iid)
+        for d in storage_sqlite.get_dead_letters():
+            self.tree.insert(
+                "",
+                "end",
+                iid=str(d["id"]),
+                values=(
+                    d["entity"],
+                    d["entity_id"],
+                    d["error"] or "",
+                    d["attempts"],
+                    d["created_at"],
+                ),
+            )
+
+    def _selected_ids(self):
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showinfo("Select", "Please select one or more rows.", parent=self)
+        return [int(iid) for iid in sel]
+
+    def retry_selected(self):
+        self._apply(storage_sqlite.requeue_dead_letter, self._selected_ids())
+
+    def discard_selected(self):
+        ids = self._selected_ids()
+        if not ids:
+            return
+        if not messagebox.askyesno(
+            "Discard",
+            "Discard the selected changes? They stay in your local data but will not be pushed.",
+            parent=self,
+        ):
+            return
+        self._apply(storage_sqlite.discard_dead_letter, ids)
+
+    def _apply(self, fn, ids):
+        # queued together, so the storage worker commits them as one transaction
+        worker = get_storage_worker()
+        for dl_id in ids[:-1]:
+            worker.submit(fn, dl_id)
+        if ids:
+            worker.submit(
+                fn,
+                ids[-1],
+                on_success=lambda _: self._changed(),
+                on_error=lambda e: messagebox.showerror("Error", str(e), parent=self),
+            )
+
+    def _changed(self):
+        self.load()
+        if callable(self.on_change):
+            self.on_change()
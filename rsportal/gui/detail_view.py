@@ -3,14 +3,12 @@ import json
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
-import threading
-import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from rsportal import storage_sqlite
+from rsportal.storage_worker import get_storage_worker
+from .timer_service import get_timer_service, tz
 from enum import Enum
 
-tz = timezone(timedelta(hours=3, minutes=0))  # UTC+3 (Uganda, kampala)
-
 
 class TaskDetailWindow(tk.Toplevel):
     def __init__(self, master, task_id: str):
@@ -37,10 +35,18 @@ class TaskDetailWindow(tk.Toplevel):
             font=(None, 14, "bold"),
         ).pack(side="left", anchor="w")
 
-        self.timer_btn = ttk.Button(header, text="Start", command=self.toggle_timer)
+        # running timers live in the shared service, so reopening a window
+        # (or opening a second one) picks up a timer that is already running
+        self.timer = get_timer_service(self)
+        self.timer_btn = ttk.Button(
+            header,
+            text="Stop" if self.timer.is_running(self.task_id) else "Start",
+            command=self.toggle_timer,
+        )
         self.timer_btn.pack(side="right")
         self.elapsed_lbl = ttk.Label(header, text="00:00:00")
         self.elapsed_lbl.pack(side="right", padx=8)
+        self.timer.attach(self.task_id, self.elapsed_lbl)
 
         # Tabs
         tabs = ttk.Notebook(self)
@@ -52,15 +58,15 @@ class TaskDetailWindow(tk.Toplevel):
 
         ttk.Label(
             details,
-            text=f"Assignee: {json.loads(self.task.get('assignee')).get('username') or '(unassigned)'}",
+            text=f"Assignee: {self.task.get('assignee_username') or '(unassigned)'}",
         ).pack(anchor="w", pady=(4, 0))
         ttk.Label(
             details,
-            text=f"Assigner: {json.loads(self.task.get('assigner')).get('username') or 'unknown'}",
+            text=f"Assigner: {self.task.get('assigner_username') or 'unknown'}",
         ).pack(anchor="w", pady=(2, 0))
         ttk.Label(
             details,
-            text=f"Project: {json.loads(self.task.get('project')).get('name') or ''}",
+            text=f"Project: {self.task.get('project_name') or ''}",
         ).pack(anchor="w", pady=(2, 0))
         ttk.Label(
             details,
@@ -887,10 +893,6 @@ class TaskDetailWindow(tk.Toplevel):
         except Exception:
             pass
 
-        self._timer_running = False
-        self._timer_start_ts = None
-        self._timer_thread = None
-
         self.load_time_entries()
 
     def load_time_entries(self):
@@ -958,14 +960,13 @@ class TaskDetailWindow(tk.Toplevel):
         saved_username = saved.get("username") if saved else None
 
         try:
-            conn = storage_sqlite._conn()
+            conn = storage_sqlite._read_conn()
             cur = conn.cursor()
             cur.execute(
                 "SELECT id, author, comment, created_at FROM comments WHERE task_id = ? ORDER BY created_at ASC",
                 (self.task_id,),
             )
             rows = cur.fetchall()
-            conn.close()
         except Exception:
             rows = []
 
@@ -1029,40 +1030,34 @@ class TaskDetailWindow(tk.Toplevel):
             pass
 
     def save_documentation(self):
-        """saving documentation writes the json data to the sqlite db"""
-
-        try:
-            conn_id = storage_sqlite._conn()
-            cur = conn_id.cursor()
-
-            cur.execute(
-                "UPDATE tasks SET documentation = ? WHERE id = ?",
-                (json.dumps(self.documentation_json, indent=2), self.task_id),
-            )
-            conn_id.commit()
-            conn_id.close()
-            print("hello")
+        """saving documentation writes the json data to the sqlite db (on the storage worker)"""
 
-            messagebox.showinfo("Saved", f"Documentation saved successfully.")
-        except Exception as e:
+        def _failed(e):
             print(e)
-            messagebox.showerror("Error", "Failed to save documentation")
+            messagebox.showerror("Error", "Failed to save documentation", parent=self)
+
+        get_storage_worker().submit(
+            storage_sqlite.save_documentation,
+            self.task_id,
+            dict(self.documentation_json),
+            on_success=lambda _: messagebox.showinfo(
+                "Saved", "Documentation saved successfully.", parent=self
+            ),
+            on_error=_failed,
+        )
 
     def load_documentation(self):
         """reload the documentation from the database."""
         try:
-            conn_id = storage_sqlite._conn()
+            conn_id = storage_sqlite._read_conn()
             cur = conn_id.cursor()
             cur.execute(
-                "SELECT documentation, author FROM tasks WHERE id = ?",
+                "SELECT documentation FROM tasks WHERE id = ?",
                 (self.task_id,),
             )
             row = cur.fetchone()
             doc_json = row[0] if row else None
 
-            conn_id.commit()
-            conn_id.close()
-
         except Exception:
             doc_json = None
             pass
@@ -1083,101 +1078,95 @@ class TaskDetailWindow(tk.Toplevel):
 
     def on_status_change(self, event=None):
         """Handler called when the status combobox value changes. Update local task
-        dict and persist to sqlite using storage_sqlite.upsert_tasks.
+        dict and persist the new status with storage_sqlite.update_task_status.
         """
         new_status = self.status_cb.get()
         self.task["status"] = new_status
-        try:
-            storage_sqlite.upsert_tasks([self.task])
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save status: {e}")
+        # write only the status: the rest of self.task may be older than what
+        # a background pull has stored since the window opened
+        get_storage_worker().submit(
+            storage_sqlite.update_task_status,
+            self.task_id,
+            new_status,
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"Failed to save status: {e}", parent=self
+            ),
+        )
 
     def add_comment(self):
         txt = self.comment_txt.get("1.0", tk.END).strip()
         if not txt:
             messagebox.showinfo("Empty", "Please enter a comment first.")
             return
-        # save to sqlite comments table
-        try:
-            # prefer to save the active username when available
-            saved = storage_sqlite.get_saved_auth()
-            author = saved.get("username") if saved else None
-            conn_id = storage_sqlite._conn()
-            cur = conn_id.cursor()
-            cur.execute(
-                "INSERT INTO comments (task_id, author, comment) VALUES (?, ?, ?)",
-                (self.task_id, author, txt),
-            )
-            conn_id.commit()
-            conn_id.close()
+        # prefer to save the active username when available
+        saved = storage_sqlite.get_saved_auth()
+        author = saved.get("username") if saved else None
+
+        def _saved(_):
             self.comment_txt.delete("1.0", tk.END)
-            messagebox.showinfo("Saved", "Comment saved locally.")
+            messagebox.showinfo("Saved", "Comment saved locally.", parent=self)
             # refresh comment list
             try:
                 self.load_comments()
             except Exception:
                 pass
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save comment: {e}")
+
+        # save to sqlite comments table
+        get_storage_worker().submit(
+            storage_sqlite.save_comment,
+            self.task_id,
+            author,
+            txt,
+            on_success=_saved,
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"Failed to save comment: {e}", parent=self
+            ),
+        )
 
     def toggle_timer(self):
-        if not self._timer_running:
+        if not self.timer.is_running(self.task_id):
             # start
-            self._timer_start_ts = datetime.now(tz).isoformat() + "Z"
-            storage_sqlite.save_time_entry(
-                self.task_id, self._timer_start_ts, None, "Started from GUI"
+            start_ts = datetime.now(tz).isoformat() + "Z"
+            self.timer.start(self.task_id, start_ts, "Started from GUI")
+            task_id = self.task_id
+            timer = self.timer
+            get_storage_worker().submit(
+                storage_sqlite.save_time_entry,
+                task_id,
+                start_ts,
+                None,
+                "Started from GUI",
+                on_success=lambda entry_id: timer.set_entry_id(task_id, entry_id),
+                on_error=lambda e: self._timer_start_failed(task_id, e),
             )
-            self._timer_running = True
             self.timer_btn.config(text="Stop")
-            self._timer_thread = threading.Thread(target=self._tick_loop, daemon=True)
-            self._timer_thread.start()
 
         else:
             # stop last running entry for this task
             now = datetime.now(tz).isoformat() + "Z"
             self.stop_entry_with_dialog(now)
 
-    def _tick_loop(self):
-        while self._timer_running:
-            # compute elapsed from last running entry start
-            try:
-                entries = storage_sqlite.get_time_entries(self.task_id)
-                # find first entry with end_time is None
-                running = None
-                for e in entries:
-                    if not e.get("end_time"):
-                        running = e
-                        break
-                if running:
-                    s = datetime.fromisoformat(
-                        running.get("start_time").replace("Z", "")
-                    )
-                    elapsed = datetime.now(tz) - s
-                    hrs = int(elapsed.total_seconds() // 3600)
-                    mins = int((elapsed.total_seconds() % 3600) // 60)
-                    secs = int(elapsed.total_seconds() % 60)
-                    self.elapsed_lbl.config(text=f"{hrs:02d}:{mins:02d}:{secs:02d}")
-                else:
-                    self.elapsed_lbl.config(text="00:00:00")
-            except Exception:
-                pass
-            time.sleep(1)
+    def _timer_start_failed(self, task_id, error):
+        # the entry was never stored: drop the timer shown as running
+        self.timer.stop(task_id)
+        parent = self if self.winfo_exists() else self.timer.root
+        if parent is self:
+            self.timer_btn.config(text="Start")
+        messagebox.showerror("Error", f"Failed to start the timer: {error}", parent=parent)
 
     def stop_entry_with_dialog(self, now_iso: str):
         """Show a modal dialog when stopping the running timer to collect notes and
         an hours/minutes adjustment. Compute start_time = now - (hours,minutes) and
         update the DB row for the running entry.
         """
-        # find running entry
-        entries = storage_sqlite.get_time_entries(self.task_id)
-        running = None
-        for e in entries:
-            if not e.get("end_time"):
-                running = e
-                break
+        running = self.timer.running_entry(self.task_id)
         if not running:
             messagebox.showinfo("No running entry", "No running time entry to stop.")
             return
+        if running.get("id") is None:
+            # the start is still queued on the storage worker
+            messagebox.showinfo("Saving", "The timer is still being saved; try again.")
+            return
 
         # prepare defaults
         now_dt = datetime.fromisoformat(now_iso.replace("Z", ""))
@@ -1240,23 +1229,21 @@ class TaskDetailWindow(tk.Toplevel):
             start_dt = now_dt - timedelta(hours=int(h), minutes=int(m), seconds=int(s))
             start_iso = start_dt.isoformat() + "Z"
             notes = notes_txt.get("1.0", tk.END).strip()
-            try:
-                conn = storage_sqlite._conn()
-                cur = conn.cursor()
-                cur.execute(
-                    "UPDATE time_entries SET end_time = ?, start_time = ?, notes = ? WHERE id = ?",
-                    (now_iso, start_iso, notes, running.get("id")),
-                )
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save time entry: {e}")
-            finally:
-                dlg.grab_release()
-                dlg.destroy()
-                self._timer_running = False
-                self.timer_btn.config(text="Start")
-                self.load_time_entries()
+            dlg.grab_release()
+            dlg.destroy()
+            self.timer.stop(self.task_id)
+            self.timer_btn.config(text="Start")
+            get_storage_worker().submit(
+                storage_sqlite.update_time_entry,
+                running.get("id"),
+                start_iso,
+                now_iso,
+                notes,
+                on_success=lambda _: self.load_time_entries(),
+                on_error=lambda e: messagebox.showerror(
+                    "Error", f"Failed to save time entry: {e}", parent=self
+                ),
+            )
 
         def do_cancel():
             dlg.grab_release()
@@ -1268,7 +1255,7 @@ class TaskDetailWindow(tk.Toplevel):
         ttk.Button(btn_frame, text="Cancel", command=do_cancel).pack(side="right")
 
     def on_close(self):
-        # if timer running, stop and record now
-        if self._timer_running:
-            self.toggle_timer()
+        # a running timer keeps running in the timer service; it is shown again
+        # when the task is reopened and stopped when the app closes
+        self.timer.detach(self.task_id, self.elapsed_lbl)
         self.destroy()
@@ -1,40 +1,121 @@
-import json
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from rsportal import storage_sqlite
+from rsportal.storage_worker import get_storage_worker
+from rsportal.sync import SyncScheduler
 from .detail_view import TaskDetailWindow
 from .auth_dialog import AuthDialog
+from .dead_letter_dialog import DeadLetterDialog
+from .search_dialog import SearchDialog
+from .quick_open import QuickOpenDialog
+
+# tasks read from sqlite per page, the most the tree holds at once, and how
+# close (in rows) to either end of the window scrolling loads the next page
+PAGE_SIZE = storage_sqlite.TASK_PAGE_SIZE
+WINDOW_ROWS = 3 * PAGE_SIZE
+PAGE_MARGIN = 50
+
+# filter choices (the server's enums)
+STATUS_CHOICES = ["TODO", "IN_PROGRESS", "BLOCKED", "PM_REVIEW", "CTO_REVIEW", "COMPLETED"]
+CATEGORY_CHOICES = [
+    "MAINTENANCE",
+    "RESEARCH",
+    "AUTOMATION",
+    "WEBSITE",
+    "CODING",
+    "MARKETING",
+    "DESIGN",
+    "SALES",
+    "TESTING",
+    "GENERAL",
+]
 
 
 class HomeView(ttk.Frame):
-    def __init__(self, parent, root):
+    def __init__(self, parent, root, scheduler=None):
         super().__init__(parent)
         self.root = root
+        # manual Sync/Push share the background scheduler's single-flight lock
+        self.scheduler = scheduler or SyncScheduler(interval=0)
         self.filter_var = tk.StringVar(value="ALL")
+        # task-list filters (see storage_sqlite.get_task_page); "status" is filter_var
+        self.filter_vars = {
+            "status": self.filter_var,
+            "urgency": tk.StringVar(value="ALL"),
+            "category": tk.StringVar(value="ALL"),
+            "project": tk.StringVar(value="ALL"),
+            "assignee": tk.StringVar(value="ALL"),
+            "due_after": tk.StringVar(value=""),
+            "due_before": tk.StringVar(value=""),
+        }
+        # column the list is sorted by (a storage_sqlite.TASK_SORT_COLUMNS key)
+        self._sort = "updated_at"
+        self._descending = True
 
         toolbar = ttk.Frame(self)
         toolbar.pack(fill="x", padx=8, pady=6)
+        self.toolbar = toolbar
 
         # refresh button refresh the task list from local sqlite cache
         refresh_btn = ttk.Button(toolbar, text="Refresh", command=self.refresh)
         refresh_btn.pack(side="left")
 
-        # the sync button pulls the latest tasks from remote API
-        ttk.Label(toolbar, text="Status:").pack(side="left", padx=(8, 4))
-        self.status_combo = ttk.Combobox(
-            toolbar,
-            values=["ALL", "TODO", "IN_PROGRESS", "DONE", "PM_REVIEW", "CTO_REVIEW"],
-            textvariable=self.filter_var,
-            state="readonly",
-            width=14,
-        )
-        self.status_combo.pack(side="left")
-        self.status_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
-
         open_btn = ttk.Button(toolbar, text="Open", command=self.open_selected)
         open_btn.pack(side="right")
 
+        # full-text search over tasks and comments (also Ctrl+F)
+        search_btn = ttk.Button(toolbar, text="Search", command=self.open_search)
+        search_btn.pack(side="right", padx=(0, 6))
+        root.bind("<Control-f>", lambda e: self.open_search())
+        # jump to a task by id, title or project
+        root.bind("<Control-p>", lambda e: self.open_quick_open())
+
+        # filters are applied in sqlite; project/assignee choices are read
+        # from the stored tasks when the list is opened
+        filter_bar = ttk.Frame(self)
+        filter_bar.pack(fill="x", padx=8)
+        self.filter_bar = filter_bar
+
+        def add_combo(key, label, values=None, values_from=None, width=12):
+            ttk.Label(filter_bar, text=label).pack(side="left", padx=(0, 4))
+            combo = ttk.Combobox(
+                filter_bar,
+                values=["ALL", *(values or [])],
+                textvariable=self.filter_vars[key],
+                state="readonly",
+                width=width,
+            )
+            if values_from:
+                combo.config(
+                    postcommand=lambda: combo.config(
+                        values=["ALL", *storage_sqlite.get_task_values(values_from)]
+                    )
+                )
+            combo.pack(side="left", padx=(0, 8))
+            combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+            return combo
+
+        def add_date(key, label):
+            ttk.Label(filter_bar, text=label).pack(side="left", padx=(0, 4))
+            entry = ttk.Entry(filter_bar, textvariable=self.filter_vars[key], width=11)
+            entry.pack(side="left", padx=(0, 8))
+            entry.bind("<Return>", lambda e: self.refresh())
+            entry.bind("<FocusOut>", lambda e: self.refresh())
+            return entry
+
+        self.status_combo = add_combo("status", "Status:", STATUS_CHOICES, width=13)
+        add_combo("urgency", "Urgency:", storage_sqlite.URGENCY_LEVELS, width=9)
+        add_combo("category", "Category:", CATEGORY_CHOICES)
+        add_combo("project", "Project:", values_from="project")
+        add_combo("assignee", "Assignee:", values_from="assignee")
+        add_date("due_after", "Due after:")
+        add_date("due_before", "Due before:")
+        ttk.Button(filter_bar, text="Clear", command=self.clear_filters).pack(
+            side="left"
+        )
+
         # Treeview
         cols = (
             "id",
@@ -46,13 +127,43 @@ class HomeView(ttk.Frame):
             "assignee",
             "urgency",
         )
-        self.tree = ttk.Treeview(self, columns=cols, show="headings")
+        self.list_frame = ttk.Frame(self)
+        self.list_frame.pack(fill="both", expand=True, padx=8, pady=8)
+        self.tree = ttk.Treeview(self.list_frame, columns=cols, show="headings")
         for c in cols:
-            self.tree.heading(c, text=c.title())
+            self.tree.heading(c, text=c.title(), command=lambda c=c: self.sort_by(c))
             self.tree.column(c, width=200 if c == "title" else 120)
 
-        self.tree.pack(fill="both", expand=True, padx=8, pady=8)
+        self.vsb = ttk.Scrollbar(
+            self.list_frame, orient="vertical", command=self.tree.yview
+        )
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        self.vsb.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
         self.tree.bind("<Double-1>", lambda e: self.open_selected())
+        # The tree holds a window of at most WINDOW_ROWS tasks, paged in from
+        # sqlite as the user scrolls. _window is that slice of the list (list
+        # columns only); _rows / _order are what the tree currently shows
+        # (task id = item iid -> row values), which _show() diffs against.
+        self._window = []
+        self._rows = {}
+        self._order = []
+        self._at_head = True
+        self._at_tail = True
+        self._page_job = None
+        self._query = None
+
+        # progress of a manual sync/push; shown only while one runs
+        self.progress_frame = ttk.Frame(self)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, length=240)
+        self.progress_bar.pack(side="left")
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.progress_label.pack(side="left", padx=(8, 0), fill="x", expand=True)
+        self.cancel_btn = ttk.Button(
+            self.progress_frame, text="Cancel", command=self.cancel_sync
+        )
+        self.cancel_btn.pack(side="right")
+        self._progress_queue = queue.Queue()
 
         # Initial load
         self.refresh()
@@ -65,112 +176,292 @@ class HomeView(ttk.Frame):
         )
         push_btn.pack(side="left", padx=(6, 0))
 
+        # changes the server rejected permanently (see DeadLetterDialog)
+        self.failed_btn = ttk.Button(
+            toolbar, text="Failed (0)", command=self.open_failed
+        )
+        self.failed_btn.pack(side="left", padx=(6, 0))
+        self._update_failed_count()
+
         logout_btn = ttk.Button(toolbar, text="Logout", command=self.logout)
         logout_btn.pack(side="right")
 
         login_btn = ttk.Button(toolbar, text="Login", command=self.open_login)
         login_btn.pack(side="right", padx=(6, 0))
 
-    def refresh(self):
-        """Refresh view from local sqlite cache (no remote network call) -> call all the local changes from the database."""
+    def _filters(self):
+        return {key: var.get().strip() for key, var in self.filter_vars.items()}
+
+    def clear_filters(self):
+        for key, var in self.filter_vars.items():
+            var.set("" if key.startswith("due_") else "ALL")
+        self.refresh()
 
-        status = self.filter_var.get()
-        tasks = storage_sqlite.get_tasks(status=status if status != "ALL" else None)
+    def sort_by(self, column):
+        """Sort by ``column``; clicking the sorted column again reverses it."""
+        if column == self._sort:
+            self._descending = not self._descending
+        else:
+            self._sort = column
+            self._descending = False
+        for c in self.tree["columns"]:
+            arrow = ""
+            if c == self._sort:
+                arrow = " \u25bc" if self._descending else " \u25b2"
+            self.tree.heading(c, text=c.title() + arrow)
+        self.refresh()
 
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+    def _page(self, **kwargs):
+        filters, sort, descending = self._query
+        return storage_sqlite.get_task_page(filters, sort, descending, **kwargs)
 
+    def refresh(self):
+        """Refresh view from local sqlite cache (no remote network call) -> call all the local changes from the database.
+
+        Filtering and sorting run in sqlite. Re-reads the window currently
+        shown (from the top of the list when the view is at the top or the
+        filters or sort changed) and applies only the difference to the tree.
+        """
+        query = (self._filters(), self._sort, self._descending)
+        limit = max(len(self._window), PAGE_SIZE)
+        if query != self._query or not self._window:
+            self._at_head = True
+            limit = PAGE_SIZE
+        previous, self._query = self._query, query
+
+        tasks = []
+        try:
+            if not self._at_head:
+                tasks = self._page(
+                    after=storage_sqlite.task_cursor(self._window[0], self._sort),
+                    inclusive=True,
+                    limit=limit,
+                )
+            if not tasks:
+                self._at_head = True
+                tasks = self._page(limit=limit)
+        except ValueError:
+            # clear the bad date first: the dialog takes focus, which refreshes again
+            self._query = previous
+            for key in ("due_after", "due_before"):
+                try:
+                    storage_sqlite._task_where({key: self.filter_vars[key].get().strip()})
+                except ValueError:
+                    self.filter_vars[key].set("")
+            messagebox.showerror("Filter", "Due dates must be written as YYYY-MM-DD.")
+            return
+        self._at_tail = len(tasks) < limit
+        self._show(tasks)
+
+    def _load_next(self):
+        """Append the next page and drop rows scrolled far above the view."""
+        page = self._page(after=storage_sqlite.task_cursor(self._window[-1], self._sort))
+        self._at_tail = len(page) < PAGE_SIZE
+        tasks = self._window + page
+        dropped = max(len(tasks) - WINDOW_ROWS, 0)
+        if dropped:
+            self._at_head = False
+        self._show(tasks[dropped:])
+        if dropped:
+            # rows above the view were removed; keep the same rows in view
+            self.tree.yview_scroll(-dropped, "units")
+
+    def _load_previous(self):
+        """Prepend the previous page and drop rows far below the view."""
+        page = self._page(before=storage_sqlite.task_cursor(self._window[0], self._sort))
+        self._at_head = len(page) < PAGE_SIZE
+        if not page:
+            return
+        tasks = page + self._window
+        if len(tasks) > WINDOW_ROWS:
+            self._at_tail = False
+        self._show(tasks[:WINDOW_ROWS])
+        self.tree.yview_scroll(len(page), "units")
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        if self._page_job is None:
+            self._page_job = self.after_idle(self._check_window)
+
+    def _check_window(self):
+        """Page in more rows when the view gets within PAGE_MARGIN of either end."""
+        self._page_job = None
+        n = len(self._order)
+        if not n:
+            return
+        first, last = self.tree.yview()
+        if not self._at_tail and (1.0 - last) * n < PAGE_MARGIN:
+            self._load_next()
+        elif not self._at_head and first * n < PAGE_MARGIN:
+            self._load_previous()
+
+    @staticmethod
+    def _row_values(t):
+        return (
+            t.get("id"),
+            t.get("title"),
+            t.get("project_name") or "",
+            t.get("category"),
+            t.get("status"),
+            t.get("deadline"),
+            t.get("assignee_username") or "",
+            t.get("urgency"),
+        )
+
+    def _show(self, tasks):
+        """Make the tree show ``tasks``, touching only rows that were added,
+        removed, changed or moved; showing the same rows again makes no
+        Treeview calls."""
+        rows = {}
+        order = []
+        window = []
         for t in tasks:
-            project = json.loads(t.get("project")) or ""
-            project = project.get("name") if isinstance(project, dict) else str(project)
-            assignee = json.loads(t.get("assignee")) or ""
-            assignee = (
-                assignee.get("username")
-                if isinstance(assignee, dict)
-                else str(assignee)
-            )
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    t.get("id"),
-                    t.get("title"),
-                    project,
-                    t.get("category"),
-                    t.get("status"),
-                    t.get("deadline"),
-                    assignee,
-                    t.get("urgency"),
-                ),
-            )
+            iid = str(t.get("id"))
+            if iid in rows:
+                continue
+            rows[iid] = self._row_values(t)
+            order.append(iid)
+            window.append(t)
+
+        gone = [iid for iid in self._order if iid not in rows]
+        if gone:
+            self.tree.delete(*gone)
+        current = [iid for iid in self._order if iid in rows]
+        if order != current:
+            # insert new rows in place and move only the ones out of place
+            for index, iid in enumerate(order):
+                if iid not in self._rows:
+                    self.tree.insert("", index, iid=iid, values=rows[iid])
+                    current.insert(index, iid)
+                elif current[index] != iid:
+                    self.tree.move(iid, "", index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+        for iid in order:
+            old = self._rows.get(iid)
+            if old is not None and old != rows[iid]:
+                self.tree.item(iid, values=rows[iid])
+
+        self._rows = rows
+        self._order = order
+        self._window = window
 
     def _set_toolbar_state(self, enabled: bool):
         # disable/enable buttons and combobox in the toolbar
         try:
-            for child in self.winfo_children():
-                if isinstance(child, ttk.Frame):
-                    for w in child.winfo_children():
-                        try:
-                            w.config(state=("normal" if enabled else "disabled"))
-                        except Exception:
-                            pass
+            for w in self.toolbar.winfo_children():
+                try:
+                    w.config(state=("normal" if enabled else "disabled"))
+                except Exception:
+                    pass
         except Exception:
             pass
 
+    def _start_progress(self):
+        self._progress_queue = queue.Queue()
+        self.progress_bar.config(mode="indeterminate", value=0)
+        self.progress_bar.start(15)
+        self.progress_label.config(text="Starting...")
+        self.cancel_btn.config(state="normal", text="Cancel")
+        self.progress_frame.pack(side="bottom", fill="x", padx=8, pady=(0, 8), before=self.list_frame)
+        self._poll_progress()
+
+    def _poll_progress(self):
+        """Drain progress events from the sync worker (runs on the Tk thread)."""
+        event = None
+        try:
+            while True:
+                event = self._progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+        if event is not None:
+            self._show_progress(event)
+        self._progress_job = self.after(100, self._poll_progress)
+
+    def _show_progress(self, event):
+        done, total = event["done"], event["total"]
+        if total:
+            if str(self.progress_bar.cget("mode")) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate")
+            self.progress_bar.config(maximum=total, value=min(done, total))
+            count = f"{done}/{total}"
+        else:
+            if str(self.progress_bar.cget("mode")) != "indeterminate":
+                self.progress_bar.config(mode="indeterminate")
+                self.progress_bar.start(15)
+            count = str(done)
+        stage = event["stage"].replace("_", " ").capitalize()
+        text = f"{stage}: {count}"
+        if event["bytes"]:
+            text += f"  ·  {event['bytes'] / 1024:.0f} KB"
+        text += f"  ·  {event['elapsed']:.0f}s"
+        self.progress_label.config(text=text)
+
+    def _stop_progress(self):
+        job = getattr(self, "_progress_job", None)
+        if job is not None:
+            self.after_cancel(job)
+            self._progress_job = None
+        self.progress_bar.stop()
+        self.progress_frame.pack_forget()
+
+    def cancel_sync(self):
+        self.cancel_btn.config(state="disabled", text="Cancelling...")
+        self.scheduler.cancel()
+
     def sync_remote(self):
         """
         fetch tasks data from the remote db via the appropriate endpoints
 
         run remote refresh in a background thread to avoid blocking UI
         """
+        self._set_toolbar_state(False)
+        self._start_progress()
 
-        def _worker():
-            self._set_toolbar_state(False)
-            try:
-                count = storage_sqlite.refresh_tasks_from_remote()
-                err = None
-            except Exception as e:
-                count = 0
-                err = e
-
-            try:
-                time_entry_count = storage_sqlite.refresh_time_entries_from_remote()
-                time_entry_err = None
-            except Exception as e:
-                print(e, "error")
-                time_entry_count = 0
-                time_entry_err = e
-
-            try:
-                comment_count = 0
-                tasks = storage_sqlite.get_tasks()
-
-                for t in tasks:
-                    comment_count += storage_sqlite.refresh_comments_from_remote(int(t.get("id")))
+        progress = self._progress_queue
 
-                comment_err = None
-
-            except Exception as e:
-                comment_count = 0
-                comment_err = e
+        def _worker():
+            result = self.scheduler.run_once(
+                push=False, on_progress=progress.put, all_comments=True
+            )
 
             def _done():
+                self._stop_progress()
                 self._set_toolbar_state(True)
                 self.refresh()
-                if err:
-                    messagebox.showerror("Sync Failed", f"Failed to sync: {err}")
-                elif time_entry_err:
+                if result is None:
+                    messagebox.showinfo("Sync", "A sync is already running.")
+                    return
+                if result["cancelled"]:
+                    messagebox.showinfo("Sync", "Sync cancelled. Data pulled so far was kept.")
+                    return
+                errors = result["errors"]
+                count = result["tasks"]
+                failures = result["comment_failures"]
+                if "tasks" in errors:
+                    messagebox.showerror("Sync Failed", f"Failed to sync: {errors['tasks']}")
+                elif "time_entries" in errors:
                     messagebox.showerror(
                         "Sync Partial",
-                        f"Tasks synced: {count}\nTime Entries sync failed: {time_entry_err}",
+                        f"Tasks changed: {count}\nTime Entries sync failed: {errors['time_entries']}",
+                    )
+                elif "comments" in errors or failures:
+                    comment_err = errors.get("comments") or (
+                        f"{len(failures)} tasks failed"
                     )
-                elif comment_err:
                     messagebox.showerror(
                         "Sync Partial",
-                        f"Tasks synced: {count}\nComments sync failed: {comment_err}",
+                        f"Tasks changed: {count}\nComments pulled: {result['comments']}\nComments sync failed: {comment_err}",
                     )
                 else:
-                    messagebox.showinfo("Synced", f"Pulled \n{count} tasks\n{time_entry_count} time entries\n{comment_count} comments\n from server.")
+                    t = result["timings"]
+                    messagebox.showinfo(
+                        "Synced",
+                        f"Changed \n{count} tasks\n{result['time_entries']} time entries\n{result['comments']} comments\n from server.\n\n"
+                        f"Took {t['total']:.1f}s (tasks {t['tasks']:.1f}s, time entries {t['time_entries']:.1f}s, "
+                        f"comments {t['comments']:.1f}s, writing {t['write']:.1f}s)",
+                    )
 
             try:
                 self.root.after(0, _done)
@@ -180,20 +471,35 @@ class HomeView(ttk.Frame):
         threading.Thread(target=_worker, daemon=True).start()
 
     def push_to_remote(self):
+        self._set_toolbar_state(False)
+        self._start_progress()
+        progress = self._progress_queue
+
         def _push_worker():
-            self._set_toolbar_state(False)
-            try:
-                count = storage_sqlite.push_local_changes_to_remote()
-                err = None
-            except Exception as e:
-                count = 0
-                err = e
+            result = self.scheduler.run_once(pull=False, on_progress=progress.put)
 
             def _done():
+                self._stop_progress()
                 self._set_toolbar_state(True)
                 self.refresh()
+                failed = self._update_failed_count()
+                if result is None:
+                    messagebox.showinfo("Push", "A sync is already running.")
+                    return
+                if result["cancelled"]:
+                    messagebox.showinfo(
+                        "Push", f"Push cancelled after {result['pushed']} changes."
+                    )
+                    return
+                count = result["pushed"]
+                err = result["errors"].get("push")
                 if err:
                     messagebox.showerror("Push Failed", f"Failed to push: {err}")
+                elif failed:
+                    messagebox.showwarning(
+                        "Pushed",
+                        f"Pushed {count} local changes to server.\n{failed} change(s) were rejected; see Failed.",
+                    )
                 else:
                     messagebox.showinfo(
                         "Pushed", f"Pushed {count} local changes to server."
@@ -206,6 +512,23 @@ class HomeView(ttk.Frame):
 
         threading.Thread(target=_push_worker, daemon=True).start()
 
+    def on_background_sync(self, kind, result):
+        """Refresh after an automatic sync (called on the Tk thread)."""
+        if kind == "sync":
+            self.refresh()
+            self._update_failed_count()
+
+    def _update_failed_count(self) -> int:
+        try:
+            failed = storage_sqlite.count_dead_letters()
+        except Exception:
+            failed = 0
+        self.failed_btn.config(text=f"Failed ({failed})")
+        return failed
+
+    def open_failed(self):
+        DeadLetterDialog(self.root, on_change=self._update_failed_count)
+
     def open_login(self):
         # Open auth dialog; on success, attempt a sync
         def _on_success():
@@ -215,20 +538,31 @@ class HomeView(ttk.Frame):
         AuthDialog(self.root, on_success=_on_success)
 
     def logout(self):
-        ok = storage_sqlite.clear_auth()
-        if ok:
-            messagebox.showinfo("Logged out", "Local credentials cleared.")
-            self.refresh()
-        else:
-            messagebox.showinfo(
-                "Not logged in", "No active local credentials were found."
-            )
+        def _done(ok):
+            if ok:
+                messagebox.showinfo("Logged out", "Local credentials cleared.")
+                self.refresh()
+            else:
+                messagebox.showinfo(
+                    "Not logged in", "No active local credentials were found."
+                )
+
+        get_storage_worker().submit(
+            storage_sqlite.clear_auth,
+            on_success=_done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to log out: {e}"),
+        )
+
+    def open_search(self):
+        SearchDialog(self.root)
+
+    def open_quick_open(self):
+        QuickOpenDialog(self.root)
 
     def open_selected(self):
         sel = self.tree.selection()
         if not sel:
             messagebox.showinfo("Select", "Please select a task to open.")
             return
-        item = self.tree.item(sel[0])
-        task_id = item.get("values")[0]
-        TaskDetailWindow(self.root, task_id)
+        # item ids are the task ids (see refresh)
+        TaskDetailWindow(self.root, sel[0])
@@ -0,0 +1,72 @@
+import tkinter as tk
+from tkinter import ttk
+from rsportal.task_index import get_task_index
+from .detail_view import TaskDetailWindow
+
+# matches listed at most
+QUICK_OPEN_LIMIT = 20
+
+
+class QuickOpenDialog(tk.Toplevel):
+    """Jump to a task by typing part of its id, title or project (Ctrl+P).
+
+    Matches come from the in-memory task index (see rsportal.task_index)
+    and are re-ranked on every keystroke. Up/Down move the selection,
+    Enter opens the task and closes the palette, Escape closes it.
+    """
+
+    def __init__(self, parent, root=None):
+        super().__init__(parent)
+        self.root = root or parent
+        self.title("Go to task")
+        self.geometry("560x340")
+        self.transient(parent)
+
+        frm = ttk.Frame(self, padding=8)
+        frm.pack(fill="both", expand=True)
+
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(frm, textvariable=self.query_var)
+        entry.pack(fill="x")
+        self.query_var.trace_add("write", lambda *a: self.update_matches())
+        entry.bind("<Return>", lambda e: self.open_selected())
+        entry.bind("<Down>", lambda e: self._move(1))
+        entry.bind("<Up>", lambda e: self._move(-1))
+        self.bind("<Escape>", lambda e: self.destroy())
+
+        self.listbox = tk.Listbox(frm, activestyle="none", exportselection=False)
+        self.listbox.pack(fill="both", expand=True, pady=(6, 0))
+        self.listbox.bind("<Double-1>", lambda e: self.open_selected())
+
+        self.index = get_task_index()
+        self._matches = []
+        entry.focus_set()
+
+    def update_matches(self):
+        self._matches = self.index.search(self.query_var.get(), limit=QUICK_OPEN_LIMIT)
+        self.listbox.delete(0, "end")
+        for t in self._matches:
+            line = f"#{t['id']}  {t.get('title') or '(untitled)'}"
+            if t.get("project_name"):
+                line += f"  —  {t['project_name']}"
+            self.listbox.insert("end", line)
+        if self._matches:
+            self.listbox.selection_set(0)
+
+    def _move(self, step):
+        if self._matches:
+            sel = self.listbox.curselection()
+            current = sel[0] if sel else -1
+            index = max(0, min(len(self._matches) - 1, current + step))
+            self.listbox.selection_clear(0, "end")
+            self.listbox.selection_set(index)
+            self.listbox.see(index)
+        return "break"
+
+    def open_selected(self):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        task_id = self._matches[sel[0]]["id"]
+        self.destroy()
+        TaskDetailWindow(self.root, task_id)
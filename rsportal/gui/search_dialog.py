@@ -0,0 +1,136 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from rsportal import storage_sqlite
+from .detail_view import TaskDetailWindow
+
+# milliseconds to wait after a keystroke before searching
+SEARCH_DELAY_MS = 150
+# results shown at most
+SEARCH_LIMIT = 50
+
+
+class SearchDialog(tk.Toplevel):
+    """Full-text search over the stored tasks and comments.
+
+    Searches as you type (see storage_sqlite.search_tasks) and lists the
+    ranked results with the matched words highlighted. Up/Down move the
+    selection; Enter or a double-click opens the task.
+    """
+
+    def __init__(self, parent, root=None):
+        super().__init__(parent)
+        self.root = root or parent
+        self.title("Search tasks")
+        self.geometry("680x460")
+        self.transient(parent)
+
+        frm = ttk.Frame(self, padding=8)
+        frm.pack(fill="both", expand=True)
+
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(frm, textvariable=self.query_var)
+        entry.pack(fill="x")
+        entry.bind("<KeyRelease>", self._on_key)
+        entry.bind("<Return>", lambda e: self.open_selected())
+        entry.bind("<Down>", lambda e: self._move(1))
+        entry.bind("<Up>", lambda e: self._move(-1))
+        self.bind("<Escape>", lambda e: self.destroy())
+
+        self.status_lbl = ttk.Label(frm, text="Type to search titles, objectives, documentation and comments.")
+        self.status_lbl.pack(fill="x", pady=(6, 4))
+
+        text_frame = ttk.Frame(frm)
+        text_frame.pack(fill="both", expand=True)
+        self.text = tk.Text(text_frame, wrap="word", cursor="arrow", padx=6, pady=4)
+        vsb = ttk.Scrollbar(text_frame, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=vsb.set, state="disabled")
+        vsb.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("title", font=("TkDefaultFont", 10, "bold"))
+        self.text.tag_configure("meta", foreground="gray40")
+        self.text.tag_configure("match", background="#fff2a8")
+        self.text.tag_configure("selected", background="#dde8f5")
+        self.text.tag_raise("match")
+
+        self._results = []
+        self._selected = None
+        self._job = None
+        entry.focus_set()
+
+    def _on_key(self, event):
+        if event.keysym in ("Return", "Up", "Down", "Escape"):
+            return
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(SEARCH_DELAY_MS, self.search)
+
+    def search(self):
+        self._job = None
+        query = self.query_var.get()
+        try:
+            self._results = storage_sqlite.search_tasks(query, limit=SEARCH_LIMIT)
+        except Exception as e:
+            messagebox.showerror("Search", f"Search failed: {e}", parent=self)
+            return
+        if not query.strip():
+            self.status_lbl.config(text="Type to search titles, objectives, documentation and comments.")
+        elif not self._results:
+            self.status_lbl.config(text="No matching tasks.")
+        else:
+            self.status_lbl.config(text=f"{len(self._results)} matching task(s)")
+        self._render()
+        self._select(0 if self._results else None)
+
+    def _insert_marked(self, text, *tags):
+        # highlighted spans are wrapped in HIGHLIGHT_START ... HIGHLIGHT_END
+        for i, part in enumerate(text.split(storage_sqlite.HIGHLIGHT_START)):
+            matched, _, rest = part.partition(storage_sqlite.HIGHLIGHT_END) if i else ("", "", part)
+            if matched:
+                self.text.insert("end", matched, (*tags, "match"))
+            if rest:
+                self.text.insert("end", rest, tags)
+
+    def _render(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        for i, r in enumerate(self._results):
+            tag = f"result-{i}"
+            self._insert_marked(r["title_highlight"] or "(untitled)", tag, "title")
+            meta = [f"#{r['id']}", r.get("status") or "", r.get("project_name") or ""]
+            if r["match"] == "comment":
+                meta.append("in a comment")
+            self.text.insert("end", "\n" + "  ·  ".join(m for m in meta if m), (tag, "meta"))
+            if r["snippet"]:
+                self.text.insert("end", "\n", tag)
+                self._insert_marked(r["snippet"], tag)
+            self.text.insert("end", "\n\n")
+            self.text.tag_bind(tag, "<Button-1>", lambda e, i=i: self._select(i))
+            self.text.tag_bind(tag, "<Double-1>", lambda e, i=i: self._open(i))
+        self.text.configure(state="disabled")
+
+    def _select(self, index):
+        self.text.tag_remove("selected", "1.0", "end")
+        self._selected = index
+        if index is None:
+            return
+        ranges = self.text.tag_ranges(f"result-{index}")
+        if ranges:
+            self.text.tag_add("selected", ranges[0], ranges[-1])
+            self.text.see(ranges[0])
+
+    def _move(self, step):
+        if self._results:
+            current = -1 if self._selected is None else self._selected
+            self._select(max(0, min(len(self._results) - 1, current + step)))
+        return "break"
+
+    def _open(self, index):
+        TaskDetailWindow(self.root, self._results[index]["id"])
+
+    def open_selected(self):
+        if self._job is not None:
+            # Enter typed before the pending search ran
+            self.after_cancel(self._job)
+            self.search()
+        if self._selected is not None:
+            self._open(self._selected)
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from rsportal import storage_sqlite
+
+tz = timezone(timedelta(hours=3, minutes=0))  # UTC+3 (Uganda, kampala)
+
+# milliseconds between label updates
+TICK_MS = 1000
+
+
+def parse_start(start_time: Optional[str]) -> Optional[datetime]:
+    """Parse a stored ``start_time`` (ISO-8601, possibly with a stray ``Z``)."""
+    if not start_time:
+        return None
+    try:
+        s = datetime.fromisoformat(start_time.replace("Z", ""))
+    except ValueError:
+        return None
+    # naive values were written as UTC
+    return s if s.tzinfo else s.replace(tzinfo=timezone.utc)
+
+
+def format_elapsed(seconds: float) -> str:
+    seconds = max(int(seconds), 0)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class TimerService:
+    """Running timers for every task, kept in memory and shared by all windows.
+
+    Running entries are read from sqlite once (see :meth:`reload`); after
+    that :meth:`start` / :meth:`stop` keep the in-memory state current and
+    the elapsed-time labels of every open window are refreshed by a single
+    ``after()`` loop on the Tk thread. A tick reads no data from the
+    database, and the loop only runs while a visible label has a running
+    timer.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # task id -> {"id", "start", "start_time", "notes"}
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._labels: Dict[str, List[Any]] = {}
+        self._job = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Re-read the running entries from sqlite (one indexed query)."""
+        running = {}
+        for e in storage_sqlite.get_running_entries():
+            start = parse_start(e.get("start_time"))
+            if start is None:
+                continue
+            running[str(e["task_id"])] = {
+                "id": e["id"],
+                "start": start,
+                "start_time": e["start_time"],
+                "notes": e.get("notes"),
+            }
+        self._running = running
+        self._schedule()
+
+    def is_running(self, task_id: str) -> bool:
+        return str(task_id) in self._running
+
+    def running_entry(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """The running entry of ``task_id``; its ``id`` is None until the row is saved."""
+        return self._running.get(str(task_id))
+
+    def start(self, task_id: str, start_time: str, notes: Optional[str] = None) -> None:
+        self._running[str(task_id)] = {
+            "id": None,
+            "start": parse_start(start_time) or datetime.now(tz),
+            "start_time": start_time,
+            "notes": notes,
+        }
+        self._schedule()
+
+    def set_entry_id(self, task_id: str, entry_id: int) -> None:
+        entry = self._running.get(str(task_id))
+        if entry is not None and entry["id"] is None:
+            entry["id"] = entry_id
+
+    def stop(self, task_id: str) -> None:
+        self._running.pop(str(task_id), None)
+        self._update(str(task_id))
+
+    def elapsed(self, task_id: str) -> float:
+        entry = self._running.get(str(task_id))
+        if entry is None:
+            return 0.0
+        return (datetime.now(tz) - entry["start"]).total_seconds()
+
+    def attach(self, task_id: str, label) -> None:
+        """Keep ``label`` showing the elapsed time of ``task_id``."""
+        self._labels.setdefault(str(task_id), []).append(label)
+        self._update(str(task_id))
+        self._schedule()
+
+    def detach(self, task_id: str, label) -> None:
+        labels = self._labels.get(str(task_id), [])
+        if label in labels:
+            labels.remove(label)
+        if not labels:
+            self._labels.pop(str(task_id), None)
+
+    def _update(self, task_id: str) -> None:
+        text = format_elapsed(self.elapsed(task_id))
+        for label in list(self._labels.get(task_id, [])):
+            try:
+                label.config(text=text)
+            except Exception:
+                # the window was closed without detaching
+                self.detach(task_id, label)
+
+    def _schedule(self) -> None:
+        if self._job is None and any(t in self._running for t in self._labels):
+            self._job = self.root.after(TICK_MS, self._tick)
+
+    def _tick(self) -> None:
+        self._job = None
+        for task_id in list(self._labels):
+            if task_id in self._running:
+                self._update(task_id)
+        self._schedule()
+
+
+_service: Optional[TimerService] = None
+
+
+def get_timer_service(widget) -> TimerService:
+    """Return the timer service of ``widget``'s Tk root, creating it on first use."""
+    global _service
+    root = widget._root()
+    if _service is None or _service.root is not root:
+        _service = TimerService(root)
+    return _service
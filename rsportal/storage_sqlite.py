@@ -1,28 +1,287 @@
 import sqlite3
+import codecs
 import json
+import threading
+import hashlib
+import random
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 import requests
-from typing import List, Dict, Any, Optional, Union
-from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from . import __init__ as _pkg  # noqa: F401 (keep package context)
-from utils import get_api_base, get_basic_auth, get_authed_session
+from .api_client import get_client
 
 
 DB_PATH = Path.home() / ".rsportal" / "rsportal.db"
 
+# connection tuning applied to every handle opened by this module
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16384
 
-def _conn() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+# one read/write and one read-only handle per (thread, db path); reused for the
+# lifetime of the thread instead of reconnecting on every call
+_local = threading.local()
+
+
+def _thread_conns() -> Dict[tuple, sqlite3.Connection]:
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    return conns
+
+
+def _configure(conn: sqlite3.Connection, readonly: bool = False) -> None:
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if not readonly:
+        # WAL lets readers run alongside the (single) writer without blocking
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+
+
+def _conn() -> sqlite3.Connection:
+    """Return this thread's shared read/write connection, opening it on first use.
+
+    The connection is owned by the manager: callers commit (or roll back) their
+    own transactions but must not close it.
+    """
+    conns = _thread_conns()
+    key = (str(DB_PATH), False)
+    conn = conns.get(key)
+    if conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), timeout=BUSY_TIMEOUT_MS / 1000)
+        _configure(conn)
+        conns[key] = conn
     return conn
 
 
-def init_db() -> None:
+def _read_conn() -> sqlite3.Connection:
+    """Return this thread's shared read-only connection.
+
+    Read-only handles never take the write lock, so GUI readers do not block
+    (or get blocked by) a sync writing on another thread. Falls back to the
+    read/write handle while the database file does not exist yet.
+    """
+    conns = _thread_conns()
+    key = (str(DB_PATH), True)
+    conn = conns.get(key)
+    if conn is None:
+        if not DB_PATH.exists():
+            return _conn()
+        try:
+            conn = sqlite3.connect(
+                DB_PATH.as_uri() + "?mode=ro",
+                uri=True,
+                timeout=BUSY_TIMEOUT_MS / 1000,
+            )
+            _configure(conn, readonly=True)
+        except sqlite3.Error:
+            return _conn()
+        conns[key] = conn
+    return conn
+
+
+@contextmanager
+def write_batch() -> Iterator[sqlite3.Connection]:
+    """Run every local write made inside the block as one transaction.
+
+    The local-write helpers (``save_*``, ``update_*``, ``upsert_*``) commit
+    through :func:`_commit`, which defers to the end of the block here, and
+    local-change and task-change listeners are notified once after that
+    commit. Any error rolls the whole block back. Nested blocks join the
+    outer one.
+    """
     conn = _conn()
-    cur = conn.cursor()
-    # tasks table
-    cur.execute(
+    if getattr(_local, "batch", None) is not None:
+        yield conn
+        return
+    batch = _local.batch = {"notify": False, "tasks": []}
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        _local.batch = None
+    if batch["tasks"]:
+        _notify_task_change(batch["tasks"])
+    if batch["notify"]:
+        _notify_local_change()
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    # inside write_batch() the block commits once at its end
+    if getattr(_local, "batch", None) is None:
+        conn.commit()
+
+
+def close_connections() -> None:
+    """Close every connection the calling thread has opened."""
+    conns = _thread_conns()
+    for conn in conns.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conns.clear()
+
+
+def _backfill_name_sql(column: str, source: str, key: str) -> str:
+    # same rules as _nested_name, for rows stored before the column existed
+    return (
+        f"UPDATE tasks SET {column} = CASE "
+        f"WHEN json_valid({source}) AND json_type({source}) = 'object' "
+        f"THEN COALESCE(json_extract({source}, '$.{key}'), '') "
+        f"ELSE COALESCE({source}, '') END"
+    )
+
+
+def _outbox_trigger_sql(table: str, columns: tuple) -> List[str]:
+    """Triggers journaling local (``synced = 0``) writes on ``table`` into the outbox.
+
+    Inserts are recorded whole; updates record the names of the ``columns``
+    that actually changed. Remote rows arrive with ``synced = 1`` and pushed
+    rows are flipped to 1, so neither is journaled.
+    """
+    differs = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)
+    changed = " UNION ALL ".join(
+        f"SELECT '{c}' AS f WHERE OLD.{c} IS NOT NEW.{c}" for c in columns
+    )
+    return [
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_outbox_insert
+    AFTER INSERT ON {table} WHEN NEW.synced = 0
+    BEGIN
+        INSERT INTO outbox (entity, entity_id, op) VALUES ('{table}', NEW.id, 'insert');
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_outbox_update
+    AFTER UPDATE ON {table} WHEN NEW.synced = 0 AND ({differs})
+    BEGIN
+        INSERT INTO outbox (entity, entity_id, op, fields)
+        VALUES ('{table}', NEW.id, 'update', (SELECT json_group_array(f) FROM ({changed})));
+    END
+    """,
+    ]
+
+
+def _dedupe_server_id_sql(table: str) -> str:
+    # one row per server id, preferring one with unpushed edits, then the oldest
+    return f"""
+    DELETE FROM {table} WHERE server_id IS NOT NULL AND id <> (
+        SELECT d.id FROM {table} d WHERE d.server_id = {table}.server_id
+        ORDER BY d.synced, d.id LIMIT 1
+    )
+    """
+
+
+# task urgencies in increasing order; ``urgency_rank`` is the position here
+URGENCY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+
+def _urgency_rank(urgency: Any) -> Optional[int]:
+    try:
+        return URGENCY_LEVELS.index(str(urgency).upper())
+    except ValueError:
+        return None
+
+
+def _backfill_urgency_rank_sql() -> str:
+    # same rules as _urgency_rank, for rows stored before the column existed
+    cases = " ".join(f"WHEN '{u}' THEN {i}" for i, u in enumerate(URGENCY_LEVELS))
+    return f"UPDATE tasks SET urgency_rank = CASE upper(urgency) {cases} END"
+
+
+def _doc_text_sql(value: str) -> str:
+    # the values of a documentation JSON object as plain text (keys are form
+    # field names, not content); anything that is not JSON is indexed as is
+    return (
+        f"CASE WHEN json_valid({value}) "
+        f"THEN (SELECT group_concat(value, ' ') FROM json_each({value})) "
+        f"ELSE {value} END"
+    )
+
+
+# full-text search tables (FTS5): columns are (task_id, text columns...);
+# each row's FTS rowid is the rowid of the row it indexes
+_SEARCH_TABLES = {
+    "tasks": ("task_fts", "id", ("title", "objective", "summary", "documentation")),
+    "comments": ("comment_fts", "task_id", ("comment",)),
+}
+
+
+def _search_value_sql(column: str, row: str) -> str:
+    value = f"{row}.{column}"
+    return _doc_text_sql(value) if column == "documentation" else value
+
+
+def _search_fill_sql(table: str) -> str:
+    fts, key, columns = _SEARCH_TABLES[table]
+    values = ", ".join(_search_value_sql(c, table) for c in columns)
+    return (
+        f"INSERT INTO {fts} (rowid, task_id, {', '.join(columns)}) "
+        f"SELECT {table}.rowid, {table}.{key}, {values} FROM {table}"
+    )
+
+
+def _search_schema_sql(table: str) -> List[str]:
+    """The FTS5 table indexing ``table`` and the triggers keeping it current."""
+    fts, key, columns = _SEARCH_TABLES[table]
+    cols = ", ".join(columns)
+    new_values = ", ".join(_search_value_sql(c, "NEW") for c in columns)
+    insert = (
+        f"INSERT INTO {fts} (rowid, task_id, {cols}) "
+        f"VALUES (NEW.rowid, NEW.{key}, {new_values});"
+    )
+    differs = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in (key, *columns))
+    return [
+        f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+        task_id UNINDEXED, {cols},
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+    BEGIN
+        {insert}
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE ON {table}
+    WHEN {differs}
+    BEGIN
+        DELETE FROM {fts} WHERE rowid = OLD.rowid;
+        {insert}
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+    BEGIN
+        DELETE FROM {fts} WHERE rowid = OLD.rowid;
+    END
+    """,
+        _search_fill_sql(table),
+    ]
+
+
+# Ordered schema migrations: applying entry N moves the database to
+# ``PRAGMA user_version`` N + 1. Never edit a step that has shipped; append a
+# new one instead so existing ~/.rsportal databases are upgraded in place.
+_MIGRATIONS: List[List[str]] = [
+    # 1: initial schema (matches databases created before versioning, hence IF NOT EXISTS)
+    [
         """
     CREATE TABLE IF NOT EXISTS tasks (
         id TEXT PRIMARY KEY,
@@ -48,11 +307,7 @@ def init_db() -> None:
         local_notes TEXT,
         synced INTEGER DEFAULT 0
     )
-    """
-    )
-
-    # time entries
-    cur.execute(
+    """,
         """
     CREATE TABLE IF NOT EXISTS time_entries (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -64,10 +319,7 @@ def init_db() -> None:
         synced INTEGER DEFAULT 0,
         created_at TEXT DEFAULT (datetime('now'))
     )
-    """
-    )
-    # comments
-    cur.execute(
+    """,
         """
     CREATE TABLE IF NOT EXISTS comments (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -77,11 +329,8 @@ def init_db() -> None:
         created_at TEXT DEFAULT (datetime('now')),
         synced INTEGER DEFAULT 0
     )
-    """
-    )
-
-    # auth table to optionally store username/password locally (per user's request)
-    cur.execute(
+    """,
+        # auth table to optionally store username/password locally (per user's request)
         """
     CREATE TABLE IF NOT EXISTS auth (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -91,16 +340,244 @@ def init_db() -> None:
         active INTEGER DEFAULT 0,
         created_at TEXT DEFAULT (datetime('now'))
     )
-    """
+    """,
+    ],
+    # 2: indexes for the hot read/sync queries
+    [
+        # get_time_entries: WHERE task_id = ? ORDER BY start_time DESC
+        "CREATE INDEX IF NOT EXISTS idx_time_entries_task_start ON time_entries (task_id, start_time)",
+        # detail window comments: WHERE task_id = ? ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS idx_comments_task_created ON comments (task_id, created_at)",
+        # get_tasks: [WHERE status = ?] ORDER BY updated_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, updated_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (updated_at)",
+        # push: WHERE synced = 0 (partial, so they stay tiny once everything is pushed)
+        "CREATE INDEX IF NOT EXISTS idx_tasks_unsynced ON tasks (id) WHERE synced = 0",
+        "CREATE INDEX IF NOT EXISTS idx_time_entries_unsynced ON time_entries (id) WHERE synced = 0",
+        "CREATE INDEX IF NOT EXISTS idx_comments_unsynced ON comments (id) WHERE synced = 0",
+        # running timers: WHERE [task_id = ? AND] end_time IS NULL
+        "CREATE INDEX IF NOT EXISTS idx_time_entries_running ON time_entries (task_id) WHERE end_time IS NULL",
+    ],
+    # 3: flattened project/assignee/assigner names, filled by upsert_tasks
+    [
+        "ALTER TABLE tasks ADD COLUMN project_name TEXT",
+        "ALTER TABLE tasks ADD COLUMN assignee_username TEXT",
+        "ALTER TABLE tasks ADD COLUMN assigner_username TEXT",
+        _backfill_name_sql("project_name", "project", "name"),
+        _backfill_name_sql("assignee_username", "assignee", "username"),
+        _backfill_name_sql("assigner_username", "assigner", "username"),
+        "CREATE INDEX IF NOT EXISTS idx_tasks_project_updated ON tasks (project_name, updated_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_assignee_updated ON tasks (assignee_username, updated_at)",
+    ],
+    # 4: outbox change journal read by push_local_changes_to_remote
+    [
+        """
+    CREATE TABLE IF NOT EXISTS outbox (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        op TEXT NOT NULL,
+        fields TEXT,
+        created_at TEXT DEFAULT (datetime('now'))
     )
+    """,
+        "CREATE INDEX IF NOT EXISTS idx_outbox_entity ON outbox (entity, entity_id)",
+        # carry over whatever was still waiting under the old synced-flag scheme;
+        # a NULL field list means "send the whole row"
+        "INSERT INTO outbox (entity, entity_id, op) SELECT 'tasks', id, 'update' FROM tasks WHERE synced = 0",
+        "INSERT INTO outbox (entity, entity_id, op) SELECT 'time_entries', id, 'insert' FROM time_entries WHERE synced = 0",
+        "INSERT INTO outbox (entity, entity_id, op) SELECT 'comments', id, 'insert' FROM comments WHERE synced = 0",
+        *_outbox_trigger_sql(
+            "tasks",
+            (
+                "project",
+                "title",
+                "task_id_link",
+                "assigner",
+                "assignee",
+                "category",
+                "status",
+                "urgency",
+                "deadline",
+                "objective",
+                "summary",
+                "documentation",
+                "credentials",
+                "pm_approved",
+                "pm_reviewer",
+                "cto_approved",
+                "cto_reviewer",
+                "local_notes",
+            ),
+        ),
+        *_outbox_trigger_sql(
+            "time_entries", ("task_id", "user", "start_time", "end_time", "notes")
+        ),
+        *_outbox_trigger_sql("comments", ("task_id", "author", "comment")),
+    ],
+    # 5: per-endpoint pull state for incremental / conditional requests
+    [
+        """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        endpoint TEXT PRIMARY KEY,
+        watermark TEXT,
+        etag TEXT,
+        last_modified TEXT,
+        synced_at TEXT
+    )
+    """,
+    ],
+    # 6: persisted Django login session (cookies + CSRF token) for the API client
+    [
+        """
+    CREATE TABLE IF NOT EXISTS http_session (
+        username TEXT PRIMARY KEY,
+        cookies TEXT,
+        csrftoken TEXT,
+        expires_at TEXT,
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+    """,
+    ],
+    # 7: client-generated idempotency keys and the server ids they map to
+    [
+        "ALTER TABLE time_entries ADD COLUMN client_uuid TEXT",
+        "ALTER TABLE time_entries ADD COLUMN server_id INTEGER",
+        "ALTER TABLE comments ADD COLUMN client_uuid TEXT",
+        "ALTER TABLE comments ADD COLUMN server_id INTEGER",
+        # rows pulled so far already carry the server's id
+        "UPDATE time_entries SET server_id = id WHERE synced = 1",
+        "UPDATE comments SET server_id = id WHERE synced = 1",
+        "UPDATE time_entries SET client_uuid = lower(hex(randomblob(16))) WHERE synced = 0",
+        "UPDATE comments SET client_uuid = lower(hex(randomblob(16))) WHERE synced = 0",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_client_uuid ON time_entries (client_uuid) WHERE client_uuid IS NOT NULL",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_client_uuid ON comments (client_uuid) WHERE client_uuid IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_time_entries_server_id ON time_entries (server_id)",
+        "CREATE INDEX IF NOT EXISTS idx_comments_server_id ON comments (server_id)",
+    ],
+    # 8: per-item push retry state and the dead-letter queue
+    [
+        "ALTER TABLE outbox ADD COLUMN attempts INTEGER DEFAULT 0",
+        "ALTER TABLE outbox ADD COLUMN next_attempt_at TEXT",
+        "ALTER TABLE outbox ADD COLUMN last_error TEXT",
+        """
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        payload TEXT,
+        error TEXT,
+        attempts INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+    """,
+    ],
+    # 9: hash of the last pulled payload, to skip rewriting unchanged rows
+    [
+        "ALTER TABLE tasks ADD COLUMN content_hash TEXT",
+        "ALTER TABLE time_entries ADD COLUMN content_hash TEXT",
+        "ALTER TABLE comments ADD COLUMN content_hash TEXT",
+    ],
+    # 10: keyset pagination of the task list on (updated_at, id); these
+    # replace the (status, updated_at) and (updated_at) indexes of step 2
+    [
+        "CREATE INDEX IF NOT EXISTS idx_tasks_updated_id ON tasks (updated_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_updated_id ON tasks (status, updated_at, id)",
+        "DROP INDEX IF EXISTS idx_tasks_updated",
+        "DROP INDEX IF EXISTS idx_tasks_status_updated",
+    ],
+    # 11: sortable task list. urgency_rank orders urgencies by severity; each
+    # sortable column gets a (column, id) index for keyset pages, which also
+    # serves equality filters on it
+    [
+        "ALTER TABLE tasks ADD COLUMN urgency_rank INTEGER",
+        _backfill_urgency_rank_sql(),
+        "CREATE INDEX IF NOT EXISTS idx_tasks_title_id ON tasks (title, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks (project_name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_category_id ON tasks (category, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_id ON tasks (status, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_deadline_id ON tasks (deadline, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_assignee_id ON tasks (assignee_username, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_urgency_id ON tasks (urgency_rank, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_urgency ON tasks (urgency)",
+    ],
+    # 12: full-text search over tasks (title, objective, summary, documentation
+    # values) and comments, kept current by triggers; see search_tasks
+    [
+        *_search_schema_sql("tasks"),
+        *_search_schema_sql("comments"),
+    ],
+    # 13: push reads the outbox, so nothing looks rows up by synced = 0 any
+    # more; stop maintaining those indexes on every write
+    [
+        "DROP INDEX IF EXISTS idx_tasks_unsynced",
+        "DROP INDEX IF EXISTS idx_time_entries_unsynced",
+        "DROP INDEX IF EXISTS idx_comments_unsynced",
+    ],
+    # 14: the task list filtered by project or assignee pages on
+    # (updated_at, id), like the status filter (see migration 10)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_tasks_project_updated_id ON tasks (project_name, updated_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_assignee_updated_id ON tasks (assignee_username, updated_at, id)",
+        "DROP INDEX IF EXISTS idx_tasks_project_updated",
+        "DROP INDEX IF EXISTS idx_tasks_assignee_updated",
+    ],
+    # 15: pulled time entries and comments are keyed on server_id, never on
+    # the local id (which a server id may collide with); see _upsert_pulled
+    [
+        _dedupe_server_id_sql("time_entries"),
+        _dedupe_server_id_sql("comments"),
+        "DROP INDEX IF EXISTS idx_time_entries_server_id",
+        "DROP INDEX IF EXISTS idx_comments_server_id",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_server_id ON time_entries (server_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_server_id ON comments (server_id)",
+    ],
+]
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate() -> int:
+    """Bring the database up to SCHEMA_VERSION and return the resulting version.
+
+    Each pending step runs in its own IMMEDIATE transaction together with the
+    ``user_version`` bump, so a failed step leaves the previous version intact
+    and concurrent processes cannot apply the same step twice. Call once at
+    startup; read and write paths assume the schema is current.
+    """
+    conn = _conn()
+    version = _schema_version(conn)
+    while version < SCHEMA_VERSION:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # re-check under the write lock in case another process migrated
+            version = _schema_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                break
+            for stmt in _MIGRATIONS[version]:
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version += 1
+    return version
 
-    conn.commit()
-    conn.close()
+
+def init_db() -> None:
+    """Backward-compatible alias for :func:`migrate`."""
+    migrate()
 
 
 def get_saved_auth() -> Union[None, Dict[str, str]]:
     """Return active saved auth from sqlite or None."""
-    conn: sqlite3.Connection = _conn()
+    conn: sqlite3.Connection = _read_conn()
     cur: sqlite3.Cursor = conn.cursor()
 
     cur.execute(
@@ -109,8 +586,6 @@ def get_saved_auth() -> Union[None, Dict[str, str]]:
 
     r: Union[None, sqlite3.Row] = cur.fetchone()
 
-    conn.close()
-
     if not r:
         return None
 
@@ -123,11 +598,7 @@ def save_auth(username: str, password: str, force: bool = False) -> bool:
     Returns True when saved/activated or already active with same creds.
     Returns False when there is an active different auth and force is False.
     """
-    base_url: str = get_api_base()
-    auth_url: str = f"{base_url}/auth/check"
-
-    resp = requests.get(auth_url, timeout=15, auth=(username, password))
-    if not resp.status_code in (200, 204):
+    if not get_client().check_credentials(username, password):
         return False
 
     existing: Union[None, Dict[str, str]] = get_saved_auth()
@@ -153,8 +624,8 @@ def save_auth(username: str, password: str, force: bool = False) -> bool:
         (username, password),
     )
 
-    conn.commit()
-    conn.close()
+    _commit(conn)
+    get_client().reset_auth()
     return True
 
 
@@ -165,14 +636,60 @@ def clear_auth() -> bool:
     cur.execute("SELECT COUNT(*) as c FROM auth WHERE active = 1")
     r: Union[None, sqlite3.Row] = cur.fetchone()
     if not r or r["c"] == 0:
-        conn.close()
         return False
     cur.execute("UPDATE auth SET active = 0 WHERE active = 1")
-    conn.commit()
-    conn.close()
+    # watermarks and login cookies belong to the account that created them
+    cur.execute("DELETE FROM sync_state")
+    cur.execute("DELETE FROM http_session")
+    _commit(conn)
+    get_client().reset_auth()
     return True
 
 
+def get_http_session(username: str) -> Optional[Dict[str, Any]]:
+    """Return the stored login session for ``username`` unless it has expired.
+
+    The result holds ``cookies`` (list of cookie dicts), ``csrftoken`` and
+    ``expires_at`` (ISO-8601 UTC).
+    """
+    cur = _read_conn().execute(
+        "SELECT cookies, csrftoken, expires_at FROM http_session WHERE username = ?",
+        (username,),
+    )
+    r = cur.fetchone()
+    if not r:
+        return None
+    if r["expires_at"] and r["expires_at"] <= datetime.utcnow().isoformat():
+        return None
+    try:
+        cookies = json.loads(r["cookies"] or "[]")
+    except Exception:
+        return None
+    return {"cookies": cookies, "csrftoken": r["csrftoken"], "expires_at": r["expires_at"]}
+
+
+def save_http_session(
+    username: str,
+    cookies: List[Dict[str, Any]],
+    csrftoken: Optional[str],
+    expires_at: str,
+) -> None:
+    """Store (replacing any previous one) the login session for ``username``."""
+    conn = _conn()
+    conn.execute("DELETE FROM http_session")
+    conn.execute(
+        "INSERT INTO http_session (username, cookies, csrftoken, expires_at) VALUES (?, ?, ?, ?)",
+        (username, json.dumps(cookies), csrftoken, expires_at),
+    )
+    conn.commit()
+
+
+def clear_http_session() -> None:
+    conn = _conn()
+    conn.execute("DELETE FROM http_session")
+    conn.commit()
+
+
 def _norm_field(v: Any) -> Any:
     """
     Normalize values so sqlite bindings accept them: primitives pass through;
@@ -189,358 +706,1310 @@ def _norm_field(v: Any) -> Any:
         return str(v)
 
 
-def upsert_time_entries(entries: List[Dict[str, Any]]):
-    conn: sqlite3.Connection = _conn()
-    cur: sqlite3.Cursor = conn.cursor()
+# rows written per transaction by the bulk upserts
+UPSERT_BATCH_SIZE = 500
+
+_TASK_COLUMNS = (
+    "id",
+    "project",
+    "title",
+    "task_id_link",
+    "assigner",
+    "assignee",
+    "category",
+    "status",
+    "urgency",
+    "deadline",
+    "objective",
+    "summary",
+    "documentation",
+    "credentials",
+    "pm_approved",
+    "pm_reviewer",
+    "cto_approved",
+    "cto_reviewer",
+    "created_at",
+    "updated_at",
+    "local_notes",
+    "project_name",
+    "assignee_username",
+    "assigner_username",
+    "urgency_rank",
+    "synced",
+)
+_TIME_ENTRY_COLUMNS = (
+    "id",
+    "task_id",
+    "user",
+    "start_time",
+    "end_time",
+    "notes",
+    "synced",
+    "client_uuid",
+    "server_id",
+)
+_COMMENT_COLUMNS = ("id", "task_id", "author", "comment", "synced", "client_uuid", "server_id")
+# pulled rows: keyed on the server's id, the local id is left to sqlite
+_PULLED_TIME_ENTRY_COLUMNS = ("server_id", *_TIME_ENTRY_COLUMNS[1:-1])
+_PULLED_COMMENT_COLUMNS = ("server_id", *_COMMENT_COLUMNS[1:-1])
+# columns a pulled row may omit; the stored value is kept instead of nulled
+_KEEP_IF_NULL = ("client_uuid",)
+
+
+def _nested_name(value: Any, key: str) -> str:
+    """Pull ``key`` out of a nested object that may arrive as a dict, a JSON
+    string or a plain string (e.g. ``project`` -> its ``name``)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except Exception:
+            return value
+    if isinstance(value, dict):
+        return str(value.get(key) or "")
+    return str(value)
+
+
+def _row_hash(row: tuple) -> str:
+    return hashlib.blake2b(
+        json.dumps(row, separators=(",", ":"), default=str).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _bulk_upsert(
+    table: str,
+    columns: tuple,
+    rows: List[tuple],
+    batch_size: Optional[int] = None,
+    key: str = "id",
+) -> Dict[str, int]:
+    """Insert-or-update ``rows`` (tuples ordered like ``columns``, ``key`` first).
+
+    Every row is stored with ``content_hash``, a digest of its values. Rows
+    whose hash matches the stored one are skipped before touching the table,
+    so unchanged rows cause no writes, trigger runs or index updates. The rest
+    of each batch is one ``executemany`` of ``INSERT ... ON CONFLICT(key) DO
+    UPDATE`` inside a single transaction. Local edits clear ``content_hash``
+    so the next pull always rewrites them.
+    Returns ``{"inserted": n, "updated": n, "unchanged": n}``.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+
+    batch_size = batch_size or UPSERT_BATCH_SIZE
+    all_columns = (*columns, "content_hash")
+    cols = ", ".join(all_columns)
+    placeholders = ", ".join("?" for _ in all_columns)
+    values = {
+        c: f"COALESCE(excluded.{c}, {table}.{c})" if c in _KEEP_IF_NULL else f"excluded.{c}"
+        for c in all_columns[1:]
+    }
+    assignments = ", ".join(f"{c}={v}" for c, v in values.items())
+    sql = (
+        f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) "
+        f"ON CONFLICT({key}) DO UPDATE SET {assignments} "
+        f"WHERE {table}.content_hash IS NOT excluded.content_hash"
+    )
+
+    conn = _conn()
+    for start in range(0, len(rows), batch_size):
+        batch = [(*r, _row_hash(r)) for r in rows[start : start + batch_size]]
+        ids = list({r[0] for r in batch})
+        try:
+            cur = conn.execute(
+                f"SELECT {key}, content_hash FROM {table} WHERE {key} IN ({', '.join('?' for _ in ids)})",
+                ids,
+            )
+            stored = {r[0]: r[1] for r in cur.fetchall()}
+            changed_rows = [r for r in batch if stored.get(r[0], "") != r[-1]]
+            changed = 0
+            if changed_rows:
+                # rowcount leaves out rows written by triggers (outbox, search
+                # index), which total_changes would count too
+                changed = conn.executemany(sql, changed_rows).rowcount
+            _commit(conn)
+        except Exception:
+            conn.rollback()
+            raise
+        inserted = len(ids) - len(stored)
+        updated = max(changed - inserted, 0)
+        counts["inserted"] += inserted
+        counts["updated"] += updated
+        counts["unchanged"] += max(len(batch) - inserted - updated, 0)
+    return counts
+
+
+def _upsert_pulled(
+    table: str, columns: tuple, rows: List[tuple], batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """Store pulled rows (tuples ordered like ``columns``, ``server_id`` first).
+
+    Local ids and server ids come from different sequences, so pulled rows
+    are keyed on ``server_id`` and new ones get a fresh local ``id``; a
+    server id never lands on a local row that happens to share it. A row
+    created here whose server id was not recorded yet (its push answer was
+    lost) is recognised by ``client_uuid`` and updated in place.
+    """
+    uuid_at = columns.index("client_uuid")
+    claims = [(r[0], r[uuid_at]) for r in rows if r[uuid_at]]
+    if claims:
+        # committed (or rolled back) together with the first batch below;
+        # a copy pulled before the server echoed client_uuid gives way
+        conn = _conn()
+        conn.executemany(
+            f"""
+        DELETE FROM {table} WHERE server_id = ?1 AND client_uuid IS NOT ?2
+            AND EXISTS (SELECT 1 FROM {table} l WHERE l.client_uuid = ?2 AND l.server_id IS NULL)
+        """,
+            claims,
+        )
+        conn.executemany(
+            f"UPDATE {table} SET server_id = ? WHERE client_uuid = ? AND server_id IS NULL",
+            claims,
+        )
+    return _bulk_upsert(table, columns, rows, batch_size, key="server_id")
+
+
+def _add_counts(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    return {k: a[k] + b[k] for k in a}
 
+
+def upsert_time_entries(
+    entries: List[Dict[str, Any]], batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """Store time entries; synced ones are pulled rows whose ``id`` is the server's."""
+    rows = []
+    pulled = []
     for e in entries:
         eid = e.get("id")
         if not eid:
             continue
-        cur.execute("SELECT id FROM time_entries WHERE id = ?", (eid,))
-        exists = cur.fetchone()
-        params = (
-            eid,
+        values = (
             _norm_field(e.get("task_id")),
             _norm_field(e.get("user")),
             _norm_field(e.get("start_time")),
             _norm_field(e.get("end_time")),
             _norm_field(e.get("notes")),
             1 if e.get("synced") else 0,
+            _norm_field(e.get("client_uuid")),
         )
-        if exists:
-            cur.execute(
-                """
-            UPDATE time_entries SET task_id=?, user=?, start_time=?, end_time=?, notes=?, synced=?
-            WHERE id=?
-            """,
-                params[1:] + (params[0],),
-            )
+        if e.get("synced"):
+            pulled.append((eid, *values))
         else:
-            cur.execute(
-                """
-            INSERT INTO time_entries (id, task_id, user, start_time, end_time, notes, synced)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-                params,
-            )
-    conn.commit()
-    conn.close()
+            rows.append((eid, *values, _norm_field(e.get("server_id"))))
+    return _add_counts(
+        _bulk_upsert("time_entries", _TIME_ENTRY_COLUMNS, rows, batch_size),
+        _upsert_pulled("time_entries", _PULLED_TIME_ENTRY_COLUMNS, pulled, batch_size),
+    )
 
 
-def upsert_tasks(tasks: List[Dict[str, Any]]):
-    conn: sqlite3.Connection = _conn()
-    cur: sqlite3.Cursor = conn.cursor()
-
+def upsert_tasks(
+    tasks: List[Dict[str, Any]], batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    rows = []
     for t in tasks:
         tid = str(t.get("id") or t.get("task_id") or "")
         if not tid:
             continue
-        cur.execute("SELECT id FROM tasks WHERE id = ?", (tid,))
-        exists = cur.fetchone()
-        params = (
-            tid,
-            _norm_field(t.get("project")),
-            _norm_field(t.get("title")),
-            _norm_field(t.get("task_id_link")),
-            _norm_field(t.get("assigner")),
-            _norm_field(t.get("assignee")),
-            _norm_field(t.get("category")),
-            _norm_field(t.get("status")),
-            _norm_field(t.get("urgency")),
-            _norm_field(t.get("deadline")),
-            _norm_field(t.get("objective")),
-            _norm_field(t.get("summary")),
-            _norm_field(t.get("documentation") or {}),
-            _norm_field(t.get("credentials")),
-            1 if t.get("pm_approved") else 0,
-            _norm_field(t.get("pm_reviewer")),
-            1 if t.get("cto_approved") else 0,
-            _norm_field(t.get("cto_reviewer")),
-            _norm_field(t.get("created_at")),
-            _norm_field(t.get("updated_at")),
-            _norm_field(t.get("local_notes") or ""),
-        )
-        if exists:
-            cur.execute(
-                """
-            UPDATE tasks SET project=?, title=?, task_id_link=?, assigner=?, assignee=?, category=?,
-                status=?, urgency=?, deadline=?, objective=?, summary=?, documentation=?, credentials=?,
-                pm_approved=?, pm_reviewer=?, cto_approved=?, cto_reviewer=?, created_at=?, updated_at=?, local_notes=?
-            WHERE id=?
-            """,
-                params[1:] + (params[0],),
-            )
-        else:
-            cur.execute(
-                """
-            INSERT INTO tasks (id, project, title, task_id_link, assigner, assignee, category, status,
-                urgency, deadline, objective, summary, documentation, credentials, pm_approved, pm_reviewer,
-                cto_approved, cto_reviewer, created_at, updated_at, local_notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                params,
+        rows.append(
+            (
+                tid,
+                _norm_field(t.get("project")),
+                _norm_field(t.get("title")),
+                _norm_field(t.get("task_id_link")),
+                _norm_field(t.get("assigner")),
+                _norm_field(t.get("assignee")),
+                _norm_field(t.get("category")),
+                _norm_field(t.get("status")),
+                _norm_field(t.get("urgency")),
+                _norm_field(t.get("deadline")),
+                _norm_field(t.get("objective")),
+                _norm_field(t.get("summary")),
+                _norm_field(t.get("documentation") or {}),
+                _norm_field(t.get("credentials")),
+                1 if t.get("pm_approved") else 0,
+                _norm_field(t.get("pm_reviewer")),
+                1 if t.get("cto_approved") else 0,
+                _norm_field(t.get("cto_reviewer")),
+                _norm_field(t.get("created_at")),
+                _norm_field(t.get("updated_at")),
+                _norm_field(t.get("local_notes") or ""),
+                _nested_name(t.get("project"), "name"),
+                _nested_name(t.get("assignee"), "username"),
+                _nested_name(t.get("assigner"), "username"),
+                _urgency_rank(t.get("urgency")),
+                1 if t.get("synced") else 0,
             )
+        )
+    counts = _bulk_upsert("tasks", _TASK_COLUMNS, rows, batch_size)
+    title_at, project_at = _TASK_COLUMNS.index("title"), _TASK_COLUMNS.index("project_name")
+    _notify_task_change(
+        [{"id": r[0], "title": r[title_at], "project_name": r[project_at]} for r in rows]
+    )
+    if any(not r[-1] for r in rows):
+        _notify_local_change()
+    return counts
 
-    conn.commit()
-    conn.close()
-
-
-def upsert_comments(comments: List[Dict[str, Any]]):
-    conn: sqlite3.Connection = _conn()
-    cur: sqlite3.Cursor = conn.cursor()
 
+def upsert_comments(
+    comments: List[Dict[str, Any]], batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """Store comments; synced ones are pulled rows whose ``id`` is the server's."""
+    rows = []
+    pulled = []
     for c in comments:
         cid = c.get("id")
         if not cid:
             continue
-        cur.execute("SELECT id FROM comments WHERE id = ?", (cid,))
-        exists = cur.fetchone()
-        params = (
-            cid,
+        values = (
             _norm_field(c.get("task_id")),
             _norm_field(c.get("author")),
             _norm_field(c.get("comment")),
             1 if c.get("synced") else 0,
+            _norm_field(c.get("client_uuid")),
         )
-        if exists:
-            cur.execute(
-                """
-            UPDATE comments SET task_id=?, author=?, comment=?, synced=?
-            WHERE id=?
-            """,
-                params[1:] + (params[0],),
-            )
+        if c.get("synced"):
+            pulled.append((cid, *values))
         else:
-            cur.execute(
-                """
-            INSERT INTO comments (id, task_id, author, comment, synced)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-                params,
-            )
-    conn.commit()
-    conn.close()
+            rows.append((cid, *values, _norm_field(c.get("server_id"))))
+    return _add_counts(
+        _bulk_upsert("comments", _COMMENT_COLUMNS, rows, batch_size),
+        _upsert_pulled("comments", _PULLED_COMMENT_COLUMNS, pulled, batch_size),
+    )
 
 
-def push_local_changes_to_remote() -> int:
-    """Push local changes (tasks, time entries, comments) to remote API. Returns number of items pushed."""
-    conn = _conn()
-    cur = conn.cursor()
+# bookkeeping and derived columns that exist only in the local database and
+# are never pushed
+_LOCAL_ONLY_COLUMNS = (
+    "synced",
+    "content_hash",
+    "project_name",
+    "assignee_username",
+    "assigner_username",
+    "urgency_rank",
+)
+
+# outbox entity -> (sync endpoint path, payload key)
+_PUSH_TARGETS = {
+    "tasks": ("/tasks/sync", "tasks"),
+    "time_entries": ("/time/entries/sync", "time_entries"),
+    "comments": ("/comments/sync", "comments"),
+}
+
+
+# distinct entities sent (and acknowledged) per push request
+PUSH_CHUNK_SIZE = 200
+
+
+def _outbox_chunk(
+    cur: sqlite3.Cursor, entity: str, upto: int, limit: int, now: str
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Collapse the outbox entries of the next ``limit`` ``entity`` rows into payloads.
+
+    Picks the oldest pending ids (journaled at or before ``upto``) whose retry
+    backoff has elapsed by ``now``. Inserted
+    rows (and carried-over rows with no field list) are sent whole; rows
+    that were only updated are sent as their identity plus the changed
+    fields. Payloads carry the local ``id`` (see :func:`_wire_row`). Rows
+    deleted since they were journaled get no payload but are still returned
+    so they are acknowledged. Returns ``(ids, payload)``.
+    """
+    cur.execute(
+        """
+    SELECT entity_id FROM outbox
+    WHERE entity = ? AND seq <= ? AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+    GROUP BY entity_id ORDER BY MIN(seq) LIMIT ?
+    """,
+        (entity, upto, now, limit),
+    )
+    chunk_ids = [r["entity_id"] for r in cur.fetchall()]
+    if not chunk_ids:
+        return [], []
+    marks = ", ".join("?" for _ in chunk_ids)
 
-    tasks = []
-    cur.execute("SELECT * FROM tasks WHERE synced = 0")
-    rows = cur.fetchall()
-    for r in rows:
-        d = dict(r)
-        try:
-            d["documentation"] = json.loads(d.get("documentation") or "{}")
-        except Exception:
-            d["documentation"] = {}
-        tasks.append(d)
+    cur.execute(
+        f"""
+    SELECT entity_id, op, fields FROM outbox
+    WHERE entity = ? AND seq <= ? AND entity_id IN ({marks}) ORDER BY seq
+    """,
+        (entity, upto, *chunk_ids),
+    )
+    ids: Dict[str, Optional[set]] = {}
+    for r in cur.fetchall():
+        fields = ids.get(r["entity_id"], set())
+        if fields is None or r["op"] == "insert" or not r["fields"]:
+            ids[r["entity_id"]] = None
+        else:
+            ids[r["entity_id"]] = fields | set(json.loads(r["fields"]))
 
-    time_entries = []
-    cur.execute("SELECT * FROM time_entries WHERE synced = 0")
-    rows = cur.fetchall()
-    for r in rows:
+    cur.execute(f"SELECT * FROM {entity} WHERE id IN ({marks})", chunk_ids)
+    payload = []
+    for r in cur.fetchall():
         d = dict(r)
-        try:
-            d["description"] = json.loads(d.get("description") or "{}")
-        except Exception:
-            d["description"] = {}
-        time_entries.append(d)
+        fields = ids.get(str(d["id"]))
+        if fields is not None:
+            keys = ("id", "client_uuid", "server_id", *sorted(fields))
+            d = {k: d[k] for k in keys if k in d}
+        if "documentation" in d:
+            try:
+                d["documentation"] = json.loads(d.get("documentation") or "{}")
+            except Exception:
+                d["documentation"] = {}
+        for column in _LOCAL_ONLY_COLUMNS:
+            d.pop(column, None)
+        payload.append(d)
+    return chunk_ids, payload
+
+
+def _wire_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """A payload row as sent: local ids never leave this database.
+
+    Rows of tables with a ``server_id`` go out with that as their ``id``
+    (and without one until the server assigned it; ``client_uuid`` names
+    them then). Task ids are the server's already.
+    """
+    if "server_id" not in row:
+        return row
+    wire = {k: v for k, v in row.items() if k not in ("id", "server_id")}
+    if row["server_id"] is not None:
+        wire["id"] = row["server_id"]
+    return wire
 
-    comments = []
-    cur.execute("SELECT * FROM comments WHERE synced = 0")
-    rows = cur.fetchall()
-    for r in rows:
-        d = dict(r)
-        try:
-            d["comment"] = d.get("comment")
-        except Exception:
-            d["comment"] = ""
-        comments.append(d)
 
-    task_url = f"{get_api_base()}/tasks/sync"
-    time_entry_url = f"{get_api_base()}/time/entries/sync"
-    comment_url = f"{get_api_base()}/comments/sync"
+def _idempotency_key(entity: str, rows: List[Dict[str, Any]]) -> str:
+    """Stable key for one push request: a retry of the same chunk reuses it."""
+    body = json.dumps([entity, rows], sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
 
+
+def _server_ids(resp: Any, key: str) -> Dict[str, Any]:
+    """Read ``{client_uuid: server id}`` from a push response, if the server sent one.
+
+    Accepts a bare list of objects or an object holding that list under the
+    payload key (e.g. ``{"time_entries": [{"client_uuid": ..., "id": ...}]}``).
+    """
     try:
-        saved: Union[None, Dict[str, str]] = get_saved_auth()
+        body = resp.json()
+    except Exception:
+        return {}
+    if isinstance(body, dict):
+        body = body.get(key) or body.get("results") or []
+    if not isinstance(body, list):
+        return {}
+    return {
+        r["client_uuid"]: r["id"]
+        for r in body
+        if isinstance(r, dict) and r.get("client_uuid") and r.get("id") is not None
+    }
+
+
+def _ack_outbox(
+    cur: sqlite3.Cursor,
+    entity: str,
+    ids: List[str],
+    upto: int,
+    server_ids: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Drop acknowledged outbox entries and mark rows synced unless they picked
+    up newer entries while the request was in flight. ``server_ids`` maps
+    client uuids to the ids the server assigned."""
+    if server_ids:
+        # a pull may have stored the server's copy before it was acknowledged
+        cur.executemany(
+            f"DELETE FROM {entity} WHERE server_id = ? AND client_uuid IS NOT ?",
+            [(sid, cu) for cu, sid in server_ids.items()],
+        )
+        cur.executemany(
+            f"UPDATE {entity} SET server_id = ? WHERE client_uuid = ?",
+            [(sid, cu) for cu, sid in server_ids.items()],
+        )
+    marks = ", ".join("?" for _ in ids)
+    cur.execute(
+        f"DELETE FROM outbox WHERE entity = ? AND seq <= ? AND entity_id IN ({marks})",
+        (entity, upto, *ids),
+    )
+    cur.execute(
+        f"""
+    UPDATE {entity} SET synced = 1
+    WHERE id IN ({marks}) AND synced = 0
+        AND NOT EXISTS (SELECT 1 FROM outbox o WHERE o.entity = ? AND o.entity_id = {entity}.id)
+    """,
+        (*ids, entity),
+    )
 
-        # helper to validate response codes
-        def _is_success_status(code: int) -> bool:
-            return code in (200, 201, 204)
 
-        if saved:
-            username = saved.get("username")
-            password = saved.get("password")
+# HTTP statuses worth retrying the same request for
+_TRANSIENT_STATUS = (408, 425, 429, 500, 502, 503, 504)
+# HTTP statuses that reject a request's content rather than the request itself
+_REJECTED_STATUS = (400, 409, 413, 422)
+# per-item statuses (from the push response) meaning "accepted"
+_ACCEPTED_ITEM_STATUS = ("ok", "accepted", "created", "updated", "unchanged", "success")
+# per-item statuses meaning "try again later"
+_TRANSIENT_ITEM_STATUS = ("retry", "transient", "timeout", "unavailable", "locked")
 
-            resp = requests.post(
-                task_url,
-                json={"tasks": tasks},
-                auth=(username, password),
-                timeout=30,
-            )
-            if resp.status_code in (401, 403):
-                return 0
-            if not _is_success_status(resp.status_code):
-                return 0
-            else:
-                cur.execute("UPDATE tasks SET synced = 1 WHERE synced = 0")
+# in-request retries of one chunk, and the backoff between them (seconds)
+PUSH_MAX_RETRIES = 3
+PUSH_BACKOFF_BASE = 0.5
+PUSH_BACKOFF_CAP = 30.0
+# pushes an item may fail transiently before it is dead-lettered, and the
+# backoff between those pushes (seconds)
+PUSH_MAX_ITEM_ATTEMPTS = 8
+PUSH_ITEM_BACKOFF_BASE = 30.0
+PUSH_ITEM_BACKOFF_CAP = 6 * 3600.0
+
+
+def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
 
-            resp = requests.post(
-                time_entry_url,
-                json={"time_entries": time_entries},
-                auth=(username, password),
-                timeout=30,
-            )
-            if resp.status_code in (401, 403):
-                return 0
-            if not _is_success_status(resp.status_code):
-                return 0
-            else:
-                cur.execute("UPDATE time_entries SET synced = 1 WHERE synced = 0")
 
-            resp = requests.post(
-                comment_url,
-                json={"comments": comments},
-                auth=(username, password),
-                timeout=30,
+def _post_with_retry(client: Any, path: str, key: str, entity: str, rows: List[Dict[str, Any]]) -> Any:
+    """POST one chunk, retrying network errors and transient statuses.
+
+    Honours a numeric ``Retry-After``. Returns the last response, or None
+    when every attempt failed at the network level.
+    """
+    resp = None
+    wire = [_wire_row(r) for r in rows]
+    for attempt in range(PUSH_MAX_RETRIES + 1):
+        try:
+            resp = client.post(
+                path,
+                json={key: wire},
+                headers={"Idempotency-Key": _idempotency_key(entity, wire)},
             )
-            if resp.status_code in (401, 403):
-                return 0
-            if not _is_success_status(resp.status_code):
-                return 0
-            else:
-                cur.execute("UPDATE comments SET synced = 1 WHERE synced = 0")
-        else:
-            # Try authed session, fall back to basic auth
-            session = get_authed_session()
-            if session is not None:
-                resp = session.post(task_url, json={"tasks": tasks}, timeout=30)
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
-
-                resp = session.post(
-                    time_entry_url, json={"time_entries": time_entries}, timeout=30
-                )
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
-
-                resp = session.post(
-                    comment_url, json={"comments": comments}, timeout=30
-                )
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
-            else:
-                auth = get_basic_auth()
-                auth_param = auth if all(auth) else None
-
-                resp = requests.post(
-                    task_url, json={"tasks": tasks}, timeout=30, auth=auth_param
-                )
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
-
-                resp = requests.post(
-                    time_entry_url,
-                    json={"time_entries": time_entries},
-                    timeout=30,
-                    auth=auth_param,
-                )
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
-
-                resp = requests.post(
-                    comment_url,
-                    json={"comments": comments},
-                    timeout=30,
-                    auth=auth_param,
-                )
-                if resp.status_code in (401, 403):
-                    return 0
-                if not _is_success_status(resp.status_code):
-                    return 0
+        except requests.RequestException:
+            resp = None
+        if resp is not None and resp.status_code not in _TRANSIENT_STATUS:
+            return resp
+        if attempt == PUSH_MAX_RETRIES:
+            break
+        delay = _backoff_delay(attempt, PUSH_BACKOFF_BASE, PUSH_BACKOFF_CAP)
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = min(float(retry_after), PUSH_BACKOFF_CAP)
+        time.sleep(delay)
+    return resp
+
+
+def _response_error(resp: Any) -> str:
+    try:
+        return f"HTTP {resp.status_code}: {resp.text[:500]}"
+    except Exception:
+        return f"HTTP {getattr(resp, 'status_code', '?')}"
+
+
+def _item_outcomes(resp: Any, key: str, rows: List[Dict[str, Any]]) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Classify every row of an accepted request as ``ok``, ``transient`` or ``permanent``.
+
+    The server may report per-item results as a list of objects (bare or
+    under the payload key) identified by ``client_uuid`` or by the ``id``
+    the row was sent with (see :func:`_wire_row`), each with
+    an optional ``status``, ``error`` and ``retryable``. Rows it does not
+    mention, and results without a status, count as accepted.
+    """
+    outcomes: Dict[str, Tuple[str, Optional[str]]] = {
+        str(r["id"]): ("ok", None) for r in rows
+    }
+    try:
+        body = resp.json()
     except Exception:
+        return outcomes
+    if isinstance(body, dict):
+        body = body.get(key) or body.get("results") or []
+    if not isinstance(body, list):
+        return outcomes
+
+    by_uuid = {r.get("client_uuid"): str(r["id"]) for r in rows if r.get("client_uuid")}
+    sent = ((_wire_row(r).get("id"), r["id"]) for r in rows)
+    by_sent_id = {str(sid): str(lid) for sid, lid in sent if sid is not None}
+    for item in body:
+        if not isinstance(item, dict):
+            continue
+        local_id = by_uuid.get(item.get("client_uuid"))
+        if local_id is None and not item.get("client_uuid"):
+            local_id = by_sent_id.get(str(item.get("id")))
+        if local_id is None:
+            continue
+        status = str(item.get("status") or "ok").lower()
+        if status in _ACCEPTED_ITEM_STATUS:
+            continue
+        error = item.get("error") or item.get("detail") or status
+        if item.get("retryable") or status in _TRANSIENT_ITEM_STATUS:
+            outcomes[local_id] = ("transient", str(error))
+        else:
+            outcomes[local_id] = ("permanent", str(error))
+    return outcomes
+
+
+def _dead_letter(
+    cur: sqlite3.Cursor, entity: str, entity_id: str, upto: int, payload: Any, error: str
+) -> None:
+    """Move an item's outbox entries to the dead-letter queue."""
+    cur.execute(
+        "SELECT MAX(attempts) AS a FROM outbox WHERE entity = ? AND entity_id = ? AND seq <= ?",
+        (entity, entity_id, upto),
+    )
+    attempts = (cur.fetchone()["a"] or 0) + 1
+    cur.execute(
+        "INSERT INTO dead_letters (entity, entity_id, payload, error, attempts) VALUES (?, ?, ?, ?, ?)",
+        (entity, entity_id, json.dumps(payload, default=str), error, attempts),
+    )
+    cur.execute(
+        "DELETE FROM outbox WHERE entity = ? AND entity_id = ? AND seq <= ?",
+        (entity, entity_id, upto),
+    )
+
+
+def _defer_item(
+    cur: sqlite3.Cursor, entity: str, entity_id: str, upto: int, payload: Any, error: str
+) -> None:
+    """Schedule a transiently failed item for a later push, or dead-letter it
+    once it has used up PUSH_MAX_ITEM_ATTEMPTS."""
+    cur.execute(
+        "SELECT MAX(attempts) AS a FROM outbox WHERE entity = ? AND entity_id = ? AND seq <= ?",
+        (entity, entity_id, upto),
+    )
+    attempts = (cur.fetchone()["a"] or 0) + 1
+    if attempts >= PUSH_MAX_ITEM_ATTEMPTS:
+        _dead_letter(cur, entity, entity_id, upto, payload, error)
+        return
+    delay = _backoff_delay(attempts, PUSH_ITEM_BACKOFF_BASE, PUSH_ITEM_BACKOFF_CAP)
+    next_at = (datetime.utcnow() + timedelta(seconds=delay)).isoformat()
+    cur.execute(
+        """
+    UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?
+    WHERE entity = ? AND entity_id = ? AND seq <= ?
+    """,
+        (attempts, next_at, error, entity, entity_id, upto),
+    )
+
+
+def _send_chunk(
+    client: Any, entity: str, path: str, key: str, rows: List[Dict[str, Any]]
+) -> Tuple[Optional[Dict[str, Tuple[str, Optional[str]]]], Dict[str, Any]]:
+    """Send one chunk and return ``(outcomes per local id, server ids)``.
+
+    ``outcomes`` is None when the push as a whole must stop (auth failure,
+    server unavailable after retries). A request rejected as a whole is
+    re-sent item by item so a single bad record is isolated.
+    """
+    resp = _post_with_retry(client, path, key, entity, rows)
+    if resp is None or resp.status_code in _TRANSIENT_STATUS:
+        return None, {}
+    if resp.status_code in (401, 403):
+        return None, {}
+    if resp.status_code in (200, 201, 202, 204):
+        return _item_outcomes(resp, key, rows), _server_ids(resp, key)
+    if resp.status_code in _REJECTED_STATUS and len(rows) > 1:
+        outcomes: Dict[str, Tuple[str, Optional[str]]] = {}
+        server_ids: Dict[str, Any] = {}
+        for row in rows:
+            one, ids = _send_chunk(client, entity, path, key, [row])
+            if one is None:
+                return None, {}
+            outcomes.update(one)
+            server_ids.update(ids)
+        return outcomes, server_ids
+    if resp.status_code in _REJECTED_STATUS:
+        return {str(rows[0]["id"]): ("permanent", _response_error(resp))}, {}
+    return None, {}
+
+
+# ``progress(done, total, nbytes)`` is called after each batch of a pull or
+# push with running totals (``total`` may be None when unknown). It may raise
+# to stop the operation at that point, e.g. when the user cancelled a sync.
+Progress = Callable[[int, Optional[int], int], None]
+
+
+def push_local_changes_to_remote(
+    chunk_size: Optional[int] = None, progress: Optional[Progress] = None
+) -> int:
+    """Push journaled local changes (tasks, time entries, comments) to the remote API.
+
+    Only entities recorded in the outbox are sent, at most ``chunk_size``
+    (default PUSH_CHUNK_SIZE) per request. Each chunk is acknowledged and
+    committed locally as soon as the server answers, so the outbox itself
+    is the resume cursor: an interrupted push picks up at the first
+    unacknowledged chunk. Entries journaled after the push started (edits
+    made while it is in flight) wait for the next push.
+
+    Results are applied per item: accepted rows are marked synced, rows the
+    server reports as transiently failed are retried on later pushes with
+    exponential backoff, and permanently rejected rows move to the
+    dead-letter queue (see :func:`get_dead_letters`) instead of blocking the
+    rest. ``progress`` is reported after every committed chunk; if it raises,
+    the push stops there. Returns number of items pushed.
+    """
+    conn = _conn()
+    cur = conn.cursor()
+    chunk_size = chunk_size or PUSH_CHUNK_SIZE
+
+    cur.execute("SELECT MAX(seq) AS seq FROM outbox")
+    upto = cur.fetchone()["seq"]
+    if upto is None:
         return 0
+    now = datetime.utcnow().isoformat()
+    total = cur.execute(
+        "SELECT COUNT(*) FROM (SELECT DISTINCT entity, entity_id FROM outbox WHERE seq <= ?)",
+        (upto,),
+    ).fetchone()[0]
+
+    pushed = 0
+    done = 0
+    try:
+        client = get_client()
+
+        for entity, (path, key) in _PUSH_TARGETS.items():
+            while True:
+                ids, rows = _outbox_chunk(cur, entity, upto, chunk_size, now)
+                if not ids:
+                    break
+                outcomes: Dict[str, Tuple[str, Optional[str]]] = {}
+                server_ids: Dict[str, Any] = {}
+                if rows:
+                    outcomes, server_ids = _send_chunk(client, entity, path, key, rows)
+                    if outcomes is None:
+                        return pushed
+                payloads = {str(r["id"]): r for r in rows}
+                accepted = []
+                for eid in ids:
+                    status, error = outcomes.get(eid, ("ok", None))
+                    if status == "ok":
+                        accepted.append(eid)
+                    elif status == "transient":
+                        _defer_item(cur, entity, eid, upto, payloads.get(eid), error)
+                    else:
+                        _dead_letter(cur, entity, eid, upto, payloads.get(eid), error)
+                if accepted:
+                    # only rows the server accepted may take its ids
+                    accepted_uuids = {
+                        payloads[eid].get("client_uuid") for eid in accepted if eid in payloads
+                    }
+                    server_ids = {
+                        cu: sid for cu, sid in server_ids.items() if cu in accepted_uuids
+                    }
+                    _ack_outbox(cur, entity, accepted, upto, server_ids)
+                conn.commit()
+                pushed += sum(1 for eid in accepted if eid in payloads)
+                done += len(ids)
+                if progress:
+                    progress(done, total, 0)
+    except Exception:
+        return pushed
+    finally:
+        # the connection outlives this call: never leave a failed chunk's
+        # half-applied acknowledgement holding the write lock
+        if conn.in_transaction:
+            conn.rollback()
+
+    return pushed
+
+
+def get_dead_letters() -> List[Dict[str, Any]]:
+    """Return the pushes the server rejected permanently, newest first."""
+    cur = _read_conn().execute(
+        "SELECT id, entity, entity_id, payload, error, attempts, created_at FROM dead_letters ORDER BY id DESC"
+    )
+    return [dict(r) for r in cur.fetchall()]
 
-    conn.commit()
-    conn.close()
-    return 0  # Placeholder implementation
 
+def count_dead_letters() -> int:
+    return _read_conn().execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
 
-def get_tasks(status: Optional[str] = None) -> List[Dict[str, Any]]:
-    """fetch all tasks from the local database based on there states"""
-    init_db()
+
+def requeue_dead_letter(dead_letter_id: int) -> None:
+    """Put a dead-lettered row back in the outbox (whole row) for the next push."""
     conn = _conn()
     cur = conn.cursor()
-    if status and status.upper() != "ALL":
-        cur.execute(
-            "SELECT * FROM tasks WHERE status = ? ORDER BY updated_at DESC", (status,)
-        )
-    else:
-        cur.execute("SELECT * FROM tasks ORDER BY updated_at DESC")
-    rows = cur.fetchall()
+    cur.execute(
+        "SELECT entity, entity_id FROM dead_letters WHERE id = ?", (dead_letter_id,)
+    )
+    r = cur.fetchone()
+    if not r:
+        return
+    cur.execute(
+        "INSERT INTO outbox (entity, entity_id, op) VALUES (?, ?, 'insert')",
+        (r["entity"], r["entity_id"]),
+    )
+    cur.execute("DELETE FROM dead_letters WHERE id = ?", (dead_letter_id,))
+    _commit(conn)
+
+
+def discard_dead_letter(dead_letter_id: int) -> None:
+    """Drop a dead-lettered change; the local row stays as it is, unsynced."""
+    conn = _conn()
+    conn.execute("DELETE FROM dead_letters WHERE id = ?", (dead_letter_id,))
+    _commit(conn)
+
+
+# task-list filter -> column it matches (equality; a list or tuple matches any of its values)
+_TASK_FILTER_COLUMNS = {
+    "status": "status",
+    "urgency": "urgency",
+    "category": "category",
+    "project": "project_name",
+    "assignee": "assignee_username",
+}
+# task-list sort key -> column; every one has a (column, id) index
+TASK_SORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "project": "project_name",
+    "category": "category",
+    "status": "status",
+    "deadline": "deadline",
+    "assignee": "assignee_username",
+    "urgency": "urgency_rank",
+    "updated_at": "updated_at",
+}
+
+
+def _task_where(filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+    """Build the WHERE terms (and their parameters) for task-list ``filters``.
+
+    Keys are those of ``_TASK_FILTER_COLUMNS`` plus ``due_after`` /
+    ``due_before`` (``YYYY-MM-DD``, inclusive) on ``deadline``. Empty values
+    and ``"ALL"`` are ignored. Raises ValueError on a malformed date.
+    """
+    where: List[str] = []
+    params: List[Any] = []
+    for key, value in (filters or {}).items():
+        if value is None or value == "" or (isinstance(value, str) and value.upper() == "ALL"):
+            continue
+        if key in _TASK_FILTER_COLUMNS:
+            column = _TASK_FILTER_COLUMNS[key]
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if not values:
+                continue
+            where.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        elif key == "due_after":
+            datetime.strptime(value, "%Y-%m-%d")
+            where.append("deadline >= ?")
+            params.append(value)
+        elif key == "due_before":
+            # deadlines may carry a time, so compare against the next day
+            day = datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1)
+            where.append("deadline < ?")
+            params.append(day.strftime("%Y-%m-%d"))
+        else:
+            raise ValueError(f"unknown task filter: {key}")
+    return where, params
+
+
+def get_tasks(
+    status: Optional[str] = None,
+    project: Optional[str] = None,
+    assignee: Optional[str] = None,
+    sort: str = "updated_at",
+    descending: bool = True,
+    **filters: Any,
+) -> List[Dict[str, Any]]:
+    """fetch all tasks from the local database based on there states
+
+    ``project`` and ``assignee`` match the flattened ``project_name`` and
+    ``assignee_username`` columns; further ``filters`` and ``sort`` are as
+    for :func:`get_task_page`. The list view pages with get_task_page
+    instead of loading every row.
+    """
+    where, params = _task_where(
+        {"status": status, "project": project, "assignee": assignee, **filters}
+    )
+    column = TASK_SORT_COLUMNS[sort]
+    direction = "DESC" if descending else "ASC"
+    sql = "SELECT * FROM tasks"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # NULLs sort first in SQLite, so descending already lists them last;
+    # leaving the IS NULL term out then lets the (column, id) index order it
+    nulls_last = "" if descending else f"{column} IS NULL, "
+    sql += f" ORDER BY {nulls_last}{column} {direction}, id {direction}"
+    cur = _read_conn().execute(sql, params)
     res = []
-    for r in rows:
+    for r in cur.fetchall():
         d = dict(r)
         try:
-            d["documentation"] = json.loads(d.get("documentation") or {})
+            d["documentation"] = json.loads(d.get("documentation") or "{}")
         except Exception:
             d["documentation"] = {}
         res.append(d)
-    conn.close()
     return res
 
 
+def get_task_values(key: str) -> List[str]:
+    """Distinct non-empty values of a filterable task field (e.g. every project name)."""
+    column = _TASK_FILTER_COLUMNS[key]
+    cur = _read_conn().execute(
+        f"SELECT DISTINCT {column} FROM tasks WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}"
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+# rows per page of the task list (see get_task_page)
+TASK_PAGE_SIZE = 200
+# the columns the task list shows, plus its sort keys
+_TASK_LIST_COLUMNS = (
+    "id",
+    "title",
+    "project_name",
+    "category",
+    "status",
+    "deadline",
+    "assignee_username",
+    "urgency",
+    "urgency_rank",
+    "updated_at",
+)
+
+# a position in the task list: (sort column value, id) of a row
+Cursor = Tuple[Any, str]
+
+
+def task_cursor(task: Dict[str, Any], sort: str = "updated_at") -> Cursor:
+    return (task.get(TASK_SORT_COLUMNS[sort]), str(task["id"]))
+
+
+def get_task_page(
+    filters: Optional[Dict[str, Any]] = None,
+    sort: str = "updated_at",
+    descending: bool = True,
+    after: Optional[Cursor] = None,
+    before: Optional[Cursor] = None,
+    inclusive: bool = False,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Return one page of the task list matching ``filters`` (see :func:`_task_where`).
+
+    Rows are ordered by the ``sort`` key (one of TASK_SORT_COLUMNS), then
+    id, with rows lacking a value last. Keyset pagination over ``(sort
+    column, id)``: ``after`` returns the rows that follow that cursor (see
+    :func:`task_cursor`), ``before`` the rows that precede it, still in list
+    order; ``inclusive`` also returns the cursor row. Each page is an index
+    range scan, so its cost does not depend on how deep into the list it is.
+    Only the list columns are read.
+    """
+    limit = limit or TASK_PAGE_SIZE
+    column = TASK_SORT_COLUMNS[sort]
+    where, params = _task_where(filters)
+    forward = before is None
+    cursor = after if forward else before
+    # read in list order going forward, in reverse going backward
+    ascending = (not descending) if forward else descending
+    op = (">" if ascending else "<") + ("=" if inclusive else "")
+    direction = "ASC" if ascending else "DESC"
+
+    # rows with a value form one index range and the NULL ones a second
+    # range after it; each entry is (condition, params, order by)
+    valued: Optional[Tuple[str, List[Any], str]] = (
+        f"{column} IS NOT NULL",
+        [],
+        f"{column} {direction}, id {direction}",
+    )
+    missing: Optional[Tuple[str, List[Any], str]] = (
+        f"{column} IS NULL",
+        [],
+        f"id {direction}",
+    )
+    if column == "id":
+        # the primary key alone is the keyset; it is never NULL
+        missing = None
+        if cursor is None:
+            valued = ("1", [], f"id {direction}")
+        else:
+            valued = (f"id {op} ?", [cursor[1]], f"id {direction}")
+    elif cursor is not None:
+        value, tid = cursor
+        if value is None:
+            missing = (f"{column} IS NULL AND id {op} ?", [tid], missing[2])
+            if forward:
+                valued = None
+        else:
+            valued = (f"({column}, id) {op} (?, ?)", [value, tid], valued[2])
+            if not forward:
+                missing = None
+
+    conn = _read_conn()
+    cols = ", ".join(_TASK_LIST_COLUMNS)
+    rows: List[Dict[str, Any]] = []
+    for rng in ([valued, missing] if forward else [missing, valued]):
+        if rng is None or len(rows) >= limit:
+            continue
+        cond, extra, order = rng
+        sql = f"SELECT {cols} FROM tasks WHERE {' AND '.join([*where, cond])} ORDER BY {order} LIMIT ?"
+        cur = conn.execute(sql, (*params, *extra, limit - len(rows)))
+        rows.extend(dict(r) for r in cur.fetchall())
+    if not forward:
+        rows.reverse()
+    return rows
+
+
+def get_task_ids() -> List[str]:
+    """The id of every stored task (read from the primary key index alone)."""
+    return [r[0] for r in _read_conn().execute("SELECT id FROM tasks")]
+
+
+def get_task_titles() -> List[Dict[str, Any]]:
+    """``id``, ``title`` and ``project_name`` of every stored task (for the quick-open index)."""
+    cur = _read_conn().execute("SELECT id, title, project_name FROM tasks")
+    return [dict(r) for r in cur.fetchall()]
+
+
 def get_task(task_id: str) -> Optional[Dict[str, Any]]:
-    conn = _conn()
+    conn = _read_conn()
     cur = conn.cursor()
     cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
     r = cur.fetchone()
     if not r:
-        conn.close()
         return None
     d = dict(r)
     try:
         d["documentation"] = json.loads(d.get("documentation") or "{}")
     except Exception:
         d["documentation"] = {}
-    conn.close()
     return d
 
 
-def refresh_comments_from_remote(task_id: int) -> int:
-    """Fetch comments from remote API and upsert into sqlite. Returns number of comments pulled."""
-    url: str = f"{get_api_base()}/tasks/{task_id}/comments"
+# search results mark matched text with these (see search_tasks)
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+# bm25 column weights: task_id (unindexed), title, objective, summary, documentation
+_TASK_SEARCH_WEIGHTS = (0.0, 10.0, 4.0, 3.0, 1.0)
+# words of context around a match in a result snippet
+_SNIPPET_TOKENS = 12
 
+
+def _search_query(text: str) -> Optional[str]:
+    """Turn what the user typed into an FTS5 query: every word, as a prefix.
+
+    Words are quoted so FTS5 operators and punctuation in the input are
+    searched for literally. Returns None when there is nothing to search.
+    """
+    terms = [w for w in text.split() if any(ch.isalnum() for ch in w)]
+    if not terms:
+        return None
+    return " AND ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def search_tasks(text: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """Full-text search over task titles, objectives, summaries, documentation and comments.
+
+    Every word must match (as a word prefix, ignoring case and accents)
+    within one task or one comment. Results are ranked by bm25, with
+    title matches weighted highest, one row per task: ``id``, ``title``,
+    ``status``, ``project_name``, ``match`` (``"task"`` or ``"comment"``),
+    ``title_highlight`` and ``snippet``. Matched words in the last two are
+    wrapped in HIGHLIGHT_START / HIGHLIGHT_END.
+    """
+    query = _search_query(text)
+    if query is None:
+        return []
+    marks = f"'{HIGHLIGHT_START}', '{HIGHLIGHT_END}'"
+    weights = ", ".join(str(w) for w in _TASK_SEARCH_WEIGHTS)
+    conn = _read_conn()
+    hits: Dict[str, Dict[str, Any]] = {}
+    cur = conn.execute(
+        f"SELECT task_id, bm25(task_fts, {weights}) AS score, "
+        f"highlight(task_fts, 1, {marks}) AS title_highlight, "
+        f"snippet(task_fts, -1, {marks}, '…', {_SNIPPET_TOKENS}) AS snippet "
+        "FROM task_fts WHERE task_fts MATCH ? ORDER BY score LIMIT ?",
+        (query, limit),
+    )
+    for r in cur.fetchall():
+        hits[str(r["task_id"])] = {**dict(r), "match": "task"}
+    cur = conn.execute(
+        f"SELECT task_id, bm25(comment_fts) AS score, "
+        f"snippet(comment_fts, 1, {marks}, '…', {_SNIPPET_TOKENS}) AS snippet "
+        "FROM comment_fts WHERE comment_fts MATCH ? ORDER BY score LIMIT ?",
+        (query, limit),
+    )
+    for r in cur.fetchall():
+        tid = str(r["task_id"])
+        if tid not in hits or r["score"] < hits[tid]["score"]:
+            # keep the task's own title highlight when it has one
+            title = hits.get(tid, {}).get("title_highlight")
+            hits[tid] = {**dict(r), "title_highlight": title, "match": "comment"}
+
+    ranked = sorted(hits.values(), key=lambda h: h["score"])[:limit]
+    if not ranked:
+        return []
+    ids = [h["task_id"] for h in ranked]
+    cur = conn.execute(
+        f"SELECT id, title, status, project_name FROM tasks WHERE id IN ({', '.join('?' for _ in ids)})",
+        ids,
+    )
+    tasks = {str(r["id"]): dict(r) for r in cur.fetchall()}
+    results = []
+    for h in ranked:
+        task = tasks.get(str(h["task_id"]))
+        if task is None:
+            # a comment on a task that is not stored locally
+            continue
+        results.append(
+            {
+                **task,
+                "match": h["match"],
+                "score": h["score"],
+                "title_highlight": h["title_highlight"] or task.get("title") or "",
+                "snippet": h["snippet"] or "",
+            }
+        )
+    return results
+
+
+def rebuild_search_index() -> None:
+    """Re-index every task and comment from scratch.
+
+    The triggers keep the index current; this is for repairing it (e.g.
+    after a VACUUM renumbered the tasks table's rowids).
+    """
+    conn = _conn()
     try:
-        saved: Union[None, Dict[str, str]] = get_saved_auth()
-        if saved:
-            resp = requests.get(
-                url, timeout=30, auth=(saved.get("username"), saved.get("password"))
-            )
-            if resp.status_code == 401 or resp.status_code == 403:
-                return 0
+        for table, (fts, _, _) in _SEARCH_TABLES.items():
+            conn.execute(f"DELETE FROM {fts}")
+            conn.execute(_search_fill_sql(table))
+        _commit(conn)
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_sync_state(endpoint: str) -> Dict[str, Optional[str]]:
+    """Return the stored pull state for ``endpoint`` (empty values when never pulled)."""
+    cur = _read_conn().execute(
+        "SELECT watermark, etag, last_modified FROM sync_state WHERE endpoint = ?",
+        (endpoint,),
+    )
+    r = cur.fetchone()
+    if not r:
+        return {"watermark": None, "etag": None, "last_modified": None}
+    return dict(r)
+
+
+def save_sync_state(
+    endpoint: str,
+    watermark: Optional[str],
+    etag: Optional[str],
+    last_modified: Optional[str],
+) -> None:
+    conn = _conn()
+    conn.execute(
+        """
+    INSERT INTO sync_state (endpoint, watermark, etag, last_modified, synced_at)
+    VALUES (?, ?, ?, ?, datetime('now'))
+    ON CONFLICT(endpoint) DO UPDATE SET watermark=excluded.watermark, etag=excluded.etag,
+        last_modified=excluded.last_modified, synced_at=excluded.synced_at
+    """,
+        (endpoint, watermark, etag, last_modified),
+    )
+    conn.commit()
+
 
-        remote_comments = resp.json()
-    except Exception as e:
+def reset_sync_state(endpoint: Optional[str] = None) -> None:
+    """Forget pull watermarks so the next pull downloads everything again."""
+    conn = _conn()
+    if endpoint:
+        conn.execute("DELETE FROM sync_state WHERE endpoint = ?", (endpoint,))
+    else:
+        conn.execute("DELETE FROM sync_state")
+    conn.commit()
+
+
+# rows per page asked of paginated endpoints, and per upsert transaction
+PULL_PAGE_SIZE = 500
+# bytes read at a time while streaming a response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _conditional_get(endpoint: str) -> requests.Response:
+    """GET ``endpoint`` asking only for what changed since the last pull.
+
+    Sends ``updated_since`` from the stored watermark plus ``If-None-Match`` /
+    ``If-Modified-Since`` validators; a 304 reply means nothing changed. The
+    body is left unread (``stream=True``) for :func:`_page_items`.
+    """
+    state = get_sync_state(endpoint)
+    headers = {}
+    params: Dict[str, Any] = {"page_size": PULL_PAGE_SIZE}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    if state.get("watermark"):
+        params["updated_since"] = state["watermark"]
+    return get_client().get(endpoint, params=params, headers=headers, stream=True)
+
+
+def _iter_text(resp: requests.Response, received: Optional[List[int]] = None) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")()
+    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        if received is not None:
+            received[0] += len(chunk)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _iter_json_array(chunks: Iterator[str], buf: str) -> Iterator[Dict[str, Any]]:
+    """Yield the objects of a JSON array as they arrive.
+
+    ``buf`` holds what was already read, just past the opening ``[``. Only
+    the element being decoded is buffered, so memory stays bounded however
+    long the array is. Raises ValueError on a malformed or truncated body.
+    """
+    decoder = json.JSONDecoder()
+    while True:
+        buf = buf.lstrip().lstrip(",").lstrip()
+        if buf.startswith("]"):
+            return
+        if buf:
+            try:
+                item, end = decoder.raw_decode(buf)
+            except ValueError:
+                pass
+            else:
+                buf = buf[end:]
+                yield item
+                continue
+        more = next(chunks, None)
+        if more is None:
+            raise ValueError("truncated JSON array in response")
+        buf += more
+
+
+def _page_items(
+    resp: requests.Response, received: Optional[List[int]] = None
+) -> Tuple[Iterable[Dict[str, Any]], Optional[str], Optional[int]]:
+    """Split one response into its items, the URL of the next page and the
+    total row count when the server reports one.
+
+    A paginated reply (``{"results": [...], "next": url, "count": n}``) is
+    one bounded page and is decoded whole; a bare array (server without
+    pagination) is decoded incrementally by :func:`_iter_json_array`.
+    Bytes read are added to ``received[0]``.
+    """
+    chunks = _iter_text(resp, received)
+    buf = ""
+    while not buf.strip():
+        more = next(chunks, None)
+        if more is None:
+            return [], None, None
+        buf += more
+    buf = buf.lstrip()
+    if buf.startswith("["):
+        return _iter_json_array(chunks, buf[1:]), None, None
+    page = json.loads(buf + "".join(chunks))
+    if isinstance(page, list):
+        return page, None, len(page)
+    return page.get("results") or [], page.get("next"), page.get("count")
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ``write(fn, *args)`` applies one storage call; the default runs it inline.
+# A sync pipeline passes its single writer's submit instead (see rsportal.sync).
+Writer = Callable[..., Any]
+
+
+def _write_inline(fn: Callable[..., Any], *args: Any) -> Any:
+    return fn(*args)
+
+
+def _changed(counts: Any) -> int:
+    if isinstance(counts, dict):
+        return counts.get("inserted", 0) + counts.get("updated", 0)
+    return 0
+
+
+def _pull_pages(
+    endpoint: str,
+    shape: Callable[[Dict[str, Any]], Dict[str, Any]],
+    upsert: Callable[[List[Dict[str, Any]]], Dict[str, int]],
+    write: Optional[Writer] = None,
+    progress: Optional[Progress] = None,
+) -> int:
+    """Pull ``endpoint`` page by page, upserting each page in its own transaction.
+
+    Follows ``next`` links until the last page. At most PULL_PAGE_SIZE rows
+    are held at a time. The watermark and validators are saved only once every
+    page is stored, so an interrupted pull resumes from the previous watermark
+    (re-applying a page is harmless). Returns the number of rows inserted or
+    updated, not counting unchanged ones; network and decoding errors propagate.
+
+    Storage calls go through ``write``; a deferred writer is expected to apply
+    them in order and to report the counts itself (the return value is then 0).
+    ``progress`` is reported after every batch; if it raises, the pull stops
+    there without advancing the watermark.
+    """
+    write = write or _write_inline
+    resp = _conditional_get(endpoint)
+    if resp.status_code in (304, 401, 403):
+        resp.close()
         return 0
-    
+    resp.raise_for_status()
+
+    first = resp
+    watermark = get_sync_state(endpoint)["watermark"]
+    total = 0
+    done = 0
+    expected: Optional[int] = None
+    received = [0]
+    while True:
+        try:
+            items, next_url, count = _page_items(resp, received)
+            if expected is None:
+                expected = count
+            for batch in _batched(items, PULL_PAGE_SIZE):
+                rows = [shape(r) for r in batch if r.get("id")]
+                total += _changed(write(upsert, rows))
+                done += len(batch)
+                if progress:
+                    progress(done, expected, received[0])
+                stamps = [r["updated_at"] for r in batch if r.get("updated_at")]
+                watermark = max(stamps + ([watermark] if watermark else []), default=None)
+        finally:
+            resp.close()
+        if not next_url:
+            break
+        resp = get_client().get(next_url, stream=True)
+        resp.raise_for_status()
+
+    write(
+        save_sync_state,
+        endpoint,
+        watermark,
+        first.headers.get("ETag"),
+        first.headers.get("Last-Modified"),
+    )
+    return total
+
+
+# max comment requests in flight during a full sync
+COMMENT_FETCH_WORKERS = 8
+
+
+def _fetch_comments(task_id: int) -> List[Dict[str, Any]]:
+    """Download one task's comments, shaped for upsert_comments. Raises on failure."""
+    resp = get_client().get(f"/tasks/{task_id}/comments")
+    resp.raise_for_status()
 
     merged_comments = []
-    for rc in remote_comments:
+    for rc in resp.json():
         cid = rc.get("id")
         if not cid:
             continue
@@ -550,130 +2019,272 @@ def refresh_comments_from_remote(task_id: int) -> int:
                 "task_id": task_id,
                 "author": rc.get("author"),
                 "comment": rc.get("comment"),
+                "client_uuid": rc.get("client_uuid"),
                 "synced": True,
             }
         )
+    return merged_comments
 
-    upsert_comments(merged_comments)
-    return len(merged_comments)
-
-
-def refresh_time_entries_from_remote() -> int:
-    """Fetch time entries from remote API and upsert into sqlite. Returns number of time entries pulled."""
-    url: str = f"{get_api_base()}/time/entries"
 
+def refresh_comments_from_remote(task_id: int) -> int:
+    """Fetch comments from remote API and upsert into sqlite. Returns number of comments changed."""
     try:
-        saved: Union[None, Dict[str, str]] = get_saved_auth()
-        if saved:
-            resp = requests.get(
-                url, timeout=30, auth=(saved.get("username"), saved.get("password"))
-            )
-            if resp.status_code == 401:
-                return 0
-            if resp.status_code == 403:
-                return 0
-
-        remote_entries = resp.json()
+        merged_comments = _fetch_comments(task_id)
     except Exception:
         return 0
 
-    merged_time_entries = []
-    for re in remote_entries:
-        eid = re.get("id")
-        if not eid:
-            continue
-        merged_time_entries.append(
-            {
-                "id": eid,
-                "task_id": re.get("task_id"),
-                "user": re.get("user"),
-                "start_time": re.get("start_time"),
-                "end_time": re.get("end_time"),
-                "notes": re.get("notes"),
-                "synced": True,
-            }
-        )
-
-    upsert_time_entries(merged_time_entries)
-    return len(merged_time_entries)
-
-
-def refresh_tasks_from_remote() -> int:
-    """Fetch tasks from remote API and upsert into sqlite. Returns number of tasks pulled."""
+    counts = upsert_comments(merged_comments)
+    return counts["inserted"] + counts["updated"]
+
+
+def refresh_all_comments_from_remote(
+    task_ids: List[int],
+    max_workers: Optional[int] = None,
+    write: Optional[Writer] = None,
+    progress: Optional[Progress] = None,
+) -> Tuple[int, Dict[int, str]]:
+    """Fetch comments for many tasks concurrently.
+
+    At most ``max_workers`` (default COMMENT_FETCH_WORKERS) requests are in
+    flight. A failing task does not abort the others. Without ``write`` all
+    comments are stored in one bulk upsert at the end; with it each task's
+    comments are handed to ``write`` as they arrive. ``progress`` counts
+    finished tasks; if it raises, requests not yet started are cancelled and
+    the error propagates. Returns the number of comments inserted or updated
+    and a ``{task_id: error}`` map of the tasks that failed.
+    """
+    if not task_ids:
+        return 0, {}
+
+    merged_comments: List[Dict[str, Any]] = []
+    failures: Dict[int, str] = {}
+    changed = 0
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers or COMMENT_FETCH_WORKERS) as pool:
+        futures = {pool.submit(_fetch_comments, tid): tid for tid in task_ids}
+        try:
+            for fut in as_completed(futures):
+                done += 1
+                try:
+                    comments = fut.result()
+                except Exception as e:
+                    failures[futures[fut]] = str(e)
+                    comments = []
+                if write is None:
+                    merged_comments.extend(comments)
+                elif comments:
+                    changed += _changed(write(upsert_comments, comments))
+                if progress:
+                    progress(done, len(task_ids), 0)
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+
+    if write is None:
+        changed = _changed(upsert_comments(merged_comments))
+    return changed, failures
+
+
+def _time_entry_from_remote(re: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": re.get("id"),
+        "task_id": re.get("task_id"),
+        "user": re.get("user"),
+        "start_time": re.get("start_time"),
+        "end_time": re.get("end_time"),
+        "notes": re.get("notes"),
+        "client_uuid": re.get("client_uuid"),
+        "synced": True,
+    }
+
+
+def pull_time_entries(
+    write: Optional[Writer] = None, progress: Optional[Progress] = None
+) -> int:
+    """Like :func:`refresh_time_entries_from_remote` but network and decoding
+    errors propagate, so callers can tell "offline" from "nothing new"."""
+    return _pull_pages(
+        "/time/entries", _time_entry_from_remote, upsert_time_entries, write, progress
+    )
 
-    url: str = f"{get_api_base()}/tasks/assigned"
 
+def refresh_time_entries_from_remote() -> int:
+    """Fetch time entries from remote API and upsert into sqlite. Returns number of time entries changed."""
     try:
-        saved: Union[None, Dict[str, str]] = get_saved_auth()
+        return pull_time_entries()
+    except (requests.RequestException, ValueError):
+        return 0
 
-        if saved:
-            resp = requests.get(
-                url, timeout=30, auth=(saved.get("username"), saved.get("password"))
-            )
 
-            if resp.status_code == 401:
-                return 0
-            if resp.status_code == 403:
-                return 0
+def _task_from_remote(rt: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": rt.get("id"),
+        "project": rt.get("project"),
+        "title": rt.get("title") or "",
+        "task_id_link": rt.get("task_id_link"),
+        "assigner": rt.get("assigner"),
+        "assignee": rt.get("assignee"),
+        "category": rt.get("category") or "GENERAL",
+        "status": rt.get("status") or "TODO",
+        "urgency": rt.get("urgency") or "MEDIUM",
+        "deadline": rt.get("deadline"),
+        "objective": rt.get("objective") or "",
+        "summary": rt.get("summary"),
+        "documentation": rt.get("documentation") or {},
+        "credentials": "",
+        "pm_approved": bool(rt.get("pm_approved")),
+        "pm_reviewer": rt.get("pm_reviewer"),
+        "cto_approved": bool(rt.get("cto_approved")),
+        "cto_reviewer": rt.get("cto_reviewer"),
+        "created_at": rt.get("created_at"),
+        "updated_at": rt.get("updated_at"),
+        "local_notes": "",
+        "synced": True,
+    }
+
+
+def pull_tasks(
+    write: Optional[Writer] = None, progress: Optional[Progress] = None
+) -> int:
+    """Like :func:`refresh_tasks_from_remote` but network and decoding errors
+    propagate, so callers can tell "offline" from "nothing new"."""
+    return _pull_pages(
+        "/tasks/assigned", _task_from_remote, upsert_tasks, write, progress
+    )
 
-        remote_tasks = resp.json()
 
-    except Exception:
+def refresh_tasks_from_remote() -> int:
+    """Fetch tasks from remote API and upsert into sqlite. Returns number of tasks changed."""
+    try:
+        return pull_tasks()
+    except (requests.RequestException, ValueError):
         return 0
 
-    merged = []
-
-    for rt in remote_tasks:
-        tid = rt.get("id")
-        if not tid:
-            continue
-        merged.append(
-            {
-                "id": tid,
-                "project": rt.get("project"),
-                "title": rt.get("title") or "",
-                "task_id_link": rt.get("task_id_link"),
-                "assigner": rt.get("assigner"),
-                "assignee": rt.get("assignee"),
-                "category": rt.get("category") or "GENERAL",
-                "status": rt.get("status") or "TODO",
-                "urgency": rt.get("urgency") or "MEDIUM",
-                "deadline": rt.get("deadline"),
-                "objective": rt.get("objective") or "",
-                "summary": rt.get("summary"),
-                "documentation": rt.get("documentation") or {},
-                "credentials": "",
-                "pm_approved": bool(rt.get("pm_approved")),
-                "pm_reviewer": rt.get("pm_reviewer"),
-                "cto_approved": bool(rt.get("cto_approved")),
-                "cto_reviewer": rt.get("cto_reviewer"),
-                "created_at": rt.get("created_at"),
-                "updated_at": rt.get("updated_at"),
-                "local_notes": "",
-            }
-        )
-
-    upsert_tasks(merged)
-    return len(merged)
-
 
 def save_time_entry(
     task_id: str, start_time: str, end_time: Optional[str], notes: Optional[str] = None
 ) -> int:
     conn = _conn()
     cur = conn.cursor()
+    # client_uuid is the idempotency key sent with every push of this row
     cur.execute(
-        "INSERT INTO time_entries (task_id, start_time, end_time, notes, synced) VALUES (?, ?, ?, ?, 0)",
-        (task_id, start_time, end_time, notes or ""),
+        "INSERT INTO time_entries (task_id, start_time, end_time, notes, synced, client_uuid) VALUES (?, ?, ?, ?, 0, ?)",
+        (task_id, start_time, end_time, notes or "", str(uuid.uuid4())),
     )
-    conn.commit()
+    _commit(conn)
+    _notify_local_change()
     rowid = cur.lastrowid
-    conn.close()
     return rowid
 
 
-def get_time_entries(task_id: str) -> List[Dict[str, Any]]:
+# callables notified (with no arguments) after a local write is committed;
+# the sync scheduler uses this to push edits promptly
+_local_change_listeners: List[Callable[[], None]] = []
+
+
+def add_local_change_listener(listener: Callable[[], None]) -> None:
+    _local_change_listeners.append(listener)
+
+
+def remove_local_change_listener(listener: Callable[[], None]) -> None:
+    try:
+        _local_change_listeners.remove(listener)
+    except ValueError:
+        pass
+
+
+def _notify_local_change() -> None:
+    batch = getattr(_local, "batch", None)
+    if batch is not None:
+        batch["notify"] = True
+        return
+    for listener in list(_local_change_listeners):
+        try:
+            listener()
+        except Exception:
+            pass
+
+
+# callables given the ``id`` / ``title`` / ``project_name`` of upserted tasks
+# after they are committed; the quick-open index stays current through this
+_task_change_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+
+def add_task_change_listener(listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+    _task_change_listeners.append(listener)
+
+
+def remove_task_change_listener(listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+    try:
+        _task_change_listeners.remove(listener)
+    except ValueError:
+        pass
+
+
+def _notify_task_change(tasks: List[Dict[str, Any]]) -> None:
+    if not tasks:
+        return
+    batch = getattr(_local, "batch", None)
+    if batch is not None:
+        batch["tasks"].extend(tasks)
+        return
+    for listener in list(_task_change_listeners):
+        try:
+            listener(tasks)
+        except Exception:
+            pass
+
+
+def update_time_entry(
+    entry_id: int, start_time: str, end_time: Optional[str], notes: Optional[str]
+) -> None:
+    """Edit a time entry locally; the change is journaled for the next push."""
+    conn = _conn()
+    conn.execute(
+        "UPDATE time_entries SET start_time = ?, end_time = ?, notes = ?, synced = 0, content_hash = NULL WHERE id = ?",
+        (start_time, end_time, notes, entry_id),
+    )
+    _commit(conn)
+    _notify_local_change()
+
+
+def save_comment(task_id: str, author: Optional[str], comment: str) -> int:
+    """Store a locally written comment and return its row id."""
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO comments (task_id, author, comment, synced, client_uuid) VALUES (?, ?, ?, 0, ?)",
+        (task_id, author, comment, str(uuid.uuid4())),
+    )
+    _commit(conn)
+    _notify_local_change()
+    return cur.lastrowid
+
+
+def save_documentation(task_id: str, documentation: Dict[str, Any]) -> None:
+    """Persist a task's documentation form locally."""
+    conn = _conn()
+    conn.execute(
+        "UPDATE tasks SET documentation = ?, synced = 0, content_hash = NULL WHERE id = ?",
+        (json.dumps(documentation, indent=2), task_id),
+    )
+    _commit(conn)
+    _notify_local_change()
+
+
+def update_task_status(task_id: str, status: str) -> None:
+    """Change a task's status locally; only ``status`` is journaled for the push."""
     conn = _conn()
+    conn.execute(
+        "UPDATE tasks SET status = ?, synced = 0, content_hash = NULL WHERE id = ?",
+        (status, task_id),
+    )
+    _commit(conn)
+    _notify_local_change()
+
+
+def get_time_entries(task_id: str) -> List[Dict[str, Any]]:
+    conn = _read_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT * FROM time_entries WHERE task_id = ? ORDER BY start_time DESC",
@@ -681,28 +2292,43 @@ def get_time_entries(task_id: str) -> List[Dict[str, Any]]:
     )
     rows = cur.fetchall()
     res = [dict(r) for r in rows]
-    conn.close()
     return res
 
 
+def get_running_entries() -> List[Dict[str, Any]]:
+    """Return the time entries that are still running (no ``end_time``)."""
+    cur = _read_conn().execute(
+        "SELECT id, task_id, start_time, notes FROM time_entries WHERE end_time IS NULL"
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
 def stop_running_entries_and_get(task_id: Optional[str] = None) -> List[Dict[str, Any]]:
     # Set end_time to now for entries with null end_time
     conn = _conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat() + "Z"
+    # resolve the running rows through idx_time_entries_running, then update by id
     if task_id:
         cur.execute(
-            "UPDATE time_entries SET end_time = ? WHERE task_id = ? AND end_time IS NULL",
-            (now, task_id),
+            "SELECT id FROM time_entries WHERE task_id = ? AND end_time IS NULL",
+            (task_id,),
         )
     else:
-        cur.execute(
-            "UPDATE time_entries SET end_time = ? WHERE end_time IS NULL", (now,)
-        )
-    conn.commit()
+        cur.execute("SELECT id FROM time_entries WHERE end_time IS NULL")
+    ids = [r[0] for r in cur.fetchall()]
+    if not ids:
+        _commit(conn)
+        return []
+    marks = ", ".join("?" for _ in ids)
+    cur.execute(
+        f"UPDATE time_entries SET end_time = ?, synced = 0, content_hash = NULL WHERE id IN ({marks})",
+        [now, *ids],
+    )
     # return affected
-    cur.execute("SELECT * FROM time_entries WHERE end_time = ?", (now,))
+    cur.execute(f"SELECT * FROM time_entries WHERE id IN ({marks})", ids)
     rows = cur.fetchall()
+    _commit(conn)
+    _notify_local_change()
     res = [dict(r) for r in rows]
-    conn.close()
     return res
@@ -0,0 +1,145 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from rsportal import storage_sqlite
+
+# writes queued by the GUI that may share one transaction
+WRITE_BATCH_SIZE = 64
+
+# ``dispatch(fn)`` runs ``fn`` on the thread that owns the callbacks, e.g.
+# ``lambda fn: root.after(0, fn)`` for the Tk main loop
+Dispatch = Callable[[Callable[[], None]], Any]
+_Job = Tuple[Future, Callable[..., Any], tuple]
+
+
+class StorageWorker:
+    """Single thread that owns the GUI's write connection.
+
+    The GUI hands it storage calls with :meth:`submit` and never waits on
+    disk or on a lock held by a background sync. Calls waiting in the queue
+    are applied together in one ``storage_sqlite.write_batch`` transaction
+    (up to ``max_batch``); if that fails, each call is retried in its own
+    transaction so one bad write does not take the others down. Futures are
+    resolved only after their transaction committed, and the ``on_success`` /
+    ``on_error`` callbacks run through ``dispatch`` (inline when it is None).
+    """
+
+    def __init__(
+        self, dispatch: Optional[Dispatch] = None, max_batch: int = WRITE_BATCH_SIZE
+    ):
+        self.dispatch = dispatch
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> Future:
+        """Queue ``fn(*args)`` and return a Future for its result."""
+        fut: Future = Future()
+        if on_success is not None or on_error is not None:
+            fut.add_done_callback(
+                lambda f: self._dispatch(self._callback, f, on_success, on_error)
+            )
+        self._queue.put((fut, fn, args))
+        return fut
+
+    def _callback(
+        self,
+        fut: Future,
+        on_success: Optional[Callable[[Any], None]],
+        on_error: Optional[Callable[[Exception], None]],
+    ) -> None:
+        error = fut.exception()
+        if error is None:
+            if on_success is not None:
+                on_success(fut.result())
+        elif on_error is not None:
+            on_error(error)
+
+    def _dispatch(self, fn: Callable[..., None], *args: Any) -> None:
+        if self.dispatch is None:
+            fn(*args)
+            return
+        try:
+            self.dispatch(lambda: fn(*args))
+        except Exception:
+            # the Tk root is gone (app closing); nobody is left to notify
+            pass
+
+    def _next_batch(self) -> Tuple[List[_Job], bool]:
+        job = self._queue.get()
+        if job is None:
+            return [], True
+        jobs = [job]
+        while len(jobs) < self.max_batch:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                return jobs, True
+            jobs.append(job)
+        return jobs, False
+
+    def _apply(self, jobs: List[_Job]) -> None:
+        results = []
+        try:
+            with storage_sqlite.write_batch():
+                for _, fn, args in jobs:
+                    results.append(fn(*args))
+        except Exception as e:
+            if len(jobs) > 1:
+                for job in jobs:
+                    self._apply([job])
+            else:
+                jobs[0][0].set_exception(e)
+            return
+        for (fut, _, _), result in zip(jobs, results):
+            fut.set_result(result)
+
+    def _run(self) -> None:
+        try:
+            stopping = False
+            while not stopping:
+                jobs, stopping = self._next_batch()
+                jobs = [j for j in jobs if j[0].set_running_or_notify_cancel()]
+                if jobs:
+                    self._apply(jobs)
+        finally:
+            storage_sqlite.close_connections()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Apply every queued write, then end the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+_worker: Optional[StorageWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_storage_worker() -> StorageWorker:
+    """Return the process-wide storage worker, starting it on first use."""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = StorageWorker()
+    return _worker
+
+
+def stop_storage_worker(timeout: Optional[float] = None) -> None:
+    """Flush and stop the shared worker (e.g. when the app closes)."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop(timeout)
+        _worker = None
@@ -0,0 +1,430 @@
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+import requests
+
+from rsportal import storage_sqlite
+from utils import get_basic_auth
+
+# seconds between automatic syncs while changes keep arriving; override with
+# RSPORTAL_SYNC_INTERVAL (0 disables automatic sync)
+DEFAULT_SYNC_INTERVAL = 300
+MIN_SYNC_INTERVAL = 30
+MAX_SYNC_INTERVAL = 3600
+# how soon a local edit is pushed (debounces bursts of edits)
+LOCAL_CHANGE_DELAY = 15
+# +/- fraction applied to every wait so clients do not sync in lockstep
+SYNC_JITTER = 0.2
+# growth of the interval after a sync that found nothing / could not connect
+IDLE_BACKOFF = 1.5
+OFFLINE_BACKOFF = 2.0
+# pages the fetch stages may queue ahead of the writer (bounds memory)
+WRITE_QUEUE_SIZE = 8
+
+
+def get_sync_interval() -> int:
+    """Resolve the automatic sync interval (seconds) from RSPORTAL_SYNC_INTERVAL."""
+    try:
+        return int(os.environ.get("RSPORTAL_SYNC_INTERVAL", DEFAULT_SYNC_INTERVAL))
+    except ValueError:
+        return DEFAULT_SYNC_INTERVAL
+
+
+class SyncCancelled(Exception):
+    """Raised inside a sync to stop it after the user cancelled."""
+
+
+class _Progress:
+    """Turns per-stage storage callbacks into progress events.
+
+    Each event is a dict ``{"stage", "done", "total", "bytes", "elapsed"}``
+    (``total`` is None when unknown) passed to ``emit``, typically
+    ``queue.Queue.put`` so the GUI can drain it on the Tk thread. Every
+    callback first checks ``cancel`` and raises SyncCancelled once it is set,
+    which stops the stage between batches.
+    """
+
+    def __init__(
+        self,
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.emit = emit
+        self.cancel = cancel or threading.Event()
+        self.started = time.monotonic()
+
+    def check(self) -> None:
+        if self.cancel.is_set():
+            raise SyncCancelled()
+
+    def event(self, stage: str, done: int = 0, total: Optional[int] = None, nbytes: int = 0) -> None:
+        if self.emit is not None:
+            self.emit(
+                {
+                    "stage": stage,
+                    "done": done,
+                    "total": total,
+                    "bytes": nbytes,
+                    "elapsed": time.monotonic() - self.started,
+                }
+            )
+
+    def for_stage(self, stage: str) -> Callable[[int, Optional[int], int], None]:
+        def report(done: int, total: Optional[int], nbytes: int) -> None:
+            self.check()
+            self.event(stage, done, total, nbytes)
+
+        return report
+
+
+class _Writer:
+    """Single thread that applies every storage write of a pull, in order.
+
+    Fetch stages hand it ``(stage, fn, *args)`` through a bounded queue, so
+    downloads overlap while SQLite only ever sees one writer. Once a write of
+    a stage fails, the rest of that stage (including its watermark) is
+    skipped. Counts, errors and time spent writing are tallied per stage.
+    """
+
+    def __init__(self, maxsize: int = WRITE_QUEUE_SIZE):
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.seconds = 0.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def for_stage(self, stage: str) -> Callable[..., None]:
+        self.counts.setdefault(stage, 0)
+
+        def submit(fn: Callable[..., Any], *args: Any) -> None:
+            self._queue.put((stage, fn, args))
+
+        return submit
+
+    def _run(self) -> None:
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                stage, fn, args = job
+                if stage in self.errors:
+                    continue
+                start = time.perf_counter()
+                try:
+                    counts = fn(*args)
+                except Exception as e:
+                    self.errors[stage] = e
+                else:
+                    if isinstance(counts, dict):
+                        self.counts[stage] += counts.get("inserted", 0) + counts.get("updated", 0)
+                finally:
+                    self.seconds += time.perf_counter() - start
+        finally:
+            storage_sqlite.close_connections()
+
+    def close(self) -> None:
+        """Wait until every queued write has been applied."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def _timed(timings: Dict[str, float], stage: str, fn: Callable[..., Any], *args: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def pull_all(
+    progress: Optional[_Progress] = None, all_comments: bool = False
+) -> Dict[str, Any]:
+    """Pull tasks, time entries and comments from the server.
+
+    The three fetch stages run at the same time and feed one writer thread,
+    so a sync takes about as long as the slowest endpoint. Comments are
+    fetched (one request per task) only for the tasks the incremental task
+    pull returned; with ``all_comments`` they start with every stored task
+    and pick up newly pulled tasks once the task stage has finished. A
+    failing stage does not stop the others.
+
+    Returns the per-stage changed-row counts plus ``comment_failures``
+    (task id -> error), ``errors`` (stage -> exception), ``timings``
+    (seconds per fetch stage, ``write`` for the writer and ``total``) and
+    ``cancelled``. Rows stored before a cancellation are kept.
+    """
+    progress = progress or _Progress()
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    errors: Dict[str, Exception] = {}
+    writer = _Writer()
+    # task ids already stored (read by the comments stage) and just pulled
+    known: Set[str] = set()
+    pulled: Set[str] = set()
+    write_tasks = writer.for_stage("tasks")
+
+    def task_write(fn: Callable[..., Any], *args: Any) -> None:
+        if fn is storage_sqlite.upsert_tasks:
+            pulled.update(str(r.get("id") or r.get("task_id") or "") for r in args[0])
+            pulled.discard("")
+        write_tasks(fn, *args)
+
+    tasks_done = threading.Event()
+
+    def tasks_stage() -> None:
+        try:
+            storage_sqlite.pull_tasks(task_write, progress.for_stage("tasks"))
+        finally:
+            tasks_done.set()
+
+    def comments_stage() -> Dict[str, str]:
+        write = writer.for_stage("comments")
+        report = progress.for_stage("comments")
+        if not all_comments:
+            tasks_done.wait()
+            progress.check()
+            _, failures = storage_sqlite.refresh_all_comments_from_remote(
+                sorted(pulled), write=write, progress=report
+            )
+            return failures
+        known.update(storage_sqlite.get_task_ids())
+        _, failures = storage_sqlite.refresh_all_comments_from_remote(
+            sorted(known), write=write, progress=report
+        )
+        tasks_done.wait()
+        progress.check()
+        new_ids = pulled - known
+        if new_ids:
+            offset = len(known)
+            _, more = storage_sqlite.refresh_all_comments_from_remote(
+                sorted(new_ids),
+                write=write,
+                progress=lambda done, total, nbytes: report(
+                    offset + done, offset + (total or 0), nbytes
+                ),
+            )
+            failures.update(more)
+        return failures
+
+    comment_failures: Dict[str, str] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = {
+                "tasks": pool.submit(_timed, timings, "tasks", tasks_stage),
+                "time_entries": pool.submit(
+                    _timed,
+                    timings,
+                    "time_entries",
+                    storage_sqlite.pull_time_entries,
+                    writer.for_stage("time_entries"),
+                    progress.for_stage("time_entries"),
+                ),
+                "comments": pool.submit(_timed, timings, "comments", comments_stage),
+            }
+            for stage, fut in futures.items():
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    errors[stage] = e
+                else:
+                    if stage == "comments":
+                        comment_failures = result
+    finally:
+        writer.close()
+
+    for stage, e in writer.errors.items():
+        errors.setdefault(stage, e)
+    cancelled = progress.cancel.is_set()
+    errors = {k: e for k, e in errors.items() if not isinstance(e, SyncCancelled)}
+    timings["write"] = writer.seconds
+    timings["total"] = time.perf_counter() - started
+    return {
+        "tasks": writer.counts.get("tasks", 0),
+        "time_entries": writer.counts.get("time_entries", 0),
+        "comments": writer.counts.get("comments", 0),
+        "comment_failures": comment_failures,
+        "errors": errors,
+        "timings": timings,
+        "cancelled": cancelled,
+    }
+
+
+def _is_offline(errors: Dict[str, Exception]) -> bool:
+    return any(
+        isinstance(e, (requests.ConnectionError, requests.Timeout))
+        for e in errors.values()
+    )
+
+
+def _has_credentials() -> bool:
+    """Whether a sync could authenticate (saved login or keyring user)."""
+    return bool(storage_sqlite.get_saved_auth()) or all(get_basic_auth())
+
+
+class SyncScheduler:
+    """Background service that pushes and pulls on an adaptive interval.
+
+    - Only one sync runs at a time; :meth:`run_once` is also the entry point
+      for the manual Sync/Push buttons and returns None while one is running.
+    - After a sync that brought changes the interval resets to ``interval``;
+      after an idle one it grows by IDLE_BACKOFF, and while offline by
+      OFFLINE_BACKOFF, up to ``max_interval``.
+    - A committed local edit (see ``storage_sqlite.add_local_change_listener``)
+      schedules a push-only sync LOCAL_CHANGE_DELAY seconds from now; the
+      next full sync keeps its time.
+    - While no credentials are saved, scheduled syncs are skipped.
+    - Every wait is jittered by +/- SYNC_JITTER, and the first one is random
+      in [0, min_interval] so a fleet started at the same time spreads out.
+    - An unexpected error in a background sync is kept in ``last_error`` and
+      backed off like an offline sync; the loop keeps running.
+
+    ``on_complete(kind, result)`` is called from the worker thread after each
+    sync; GUI callers must hop back to the Tk thread themselves.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[int] = None,
+        min_interval: int = MIN_SYNC_INTERVAL,
+        max_interval: int = MAX_SYNC_INTERVAL,
+        on_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ):
+        self.interval = interval if interval is not None else get_sync_interval()
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, self.interval)
+        self.on_complete = on_complete
+        self._current = max(self.interval, min_interval)
+        self._due = time.monotonic()
+        # when a local edit is to be pushed, if one is pending
+        self._push_due: Optional[float] = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._running = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._due = time.monotonic() + random.uniform(0, self.min_interval)
+        storage_sqlite.add_local_change_listener(self.notify_local_change)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        storage_sqlite.remove_local_change_listener(self.notify_local_change)
+        self._stopped.set()
+        self._cancel.set()
+        self._wake.set()
+
+    def cancel(self) -> None:
+        """Stop the running sync, if any, after its current batch."""
+        if self.busy:
+            self._cancel.set()
+
+    def notify_local_change(self) -> None:
+        """Schedule a push soon after a local edit."""
+        due = time.monotonic() + LOCAL_CHANGE_DELAY
+        if self._push_due is None or due < self._push_due:
+            self._push_due = due
+        self._wake.set()
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - SYNC_JITTER, 1 + SYNC_JITTER)
+
+    def _loop(self) -> None:
+        while not self._stopped.is_set():
+            push_due = self._push_due
+            due = self._due if push_due is None else min(self._due, push_due)
+            self._wake.wait(max(0.0, due - time.monotonic()))
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            now = time.monotonic()
+            pull = now >= self._due
+            if not pull and (self._push_due is None or now < self._push_due):
+                continue
+            self._push_due = None
+            if not _has_credentials():
+                # nobody is signed in: every request would be rejected
+                self._due = now + self._jittered(self._current)
+                continue
+            try:
+                if self.run_once(pull=pull) is None and not pull:
+                    # a manual sync is running: push after it instead
+                    self.notify_local_change()
+                self.last_error = None
+            except Exception as e:
+                # never let one bad sync end auto-sync for the session
+                self.last_error = e
+                self._current = min(self._current * OFFLINE_BACKOFF, self.max_interval)
+            if pull:
+                self._due = time.monotonic() + self._jittered(self._current)
+
+    def _adapt(self, result: Dict[str, Any]) -> None:
+        if _is_offline(result.get("errors") or {}):
+            self._current = min(self._current * OFFLINE_BACKOFF, self.max_interval)
+        elif any(result.get(k) for k in ("pushed", "tasks", "time_entries", "comments")):
+            self._current = max(self.interval, self.min_interval)
+        else:
+            self._current = min(self._current * IDLE_BACKOFF, self.max_interval)
+
+    def run_once(
+        self,
+        push: bool = True,
+        pull: bool = True,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        all_comments: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Run one sync now (push first so the pull sees our own edits).
+
+        ``all_comments`` refreshes the comments of every task, not only of
+        the tasks pulled (see :func:`pull_all`). ``on_progress`` receives progress events (see ``_Progress``) from the
+        worker threads; :meth:`cancel` stops the sync between batches and sets
+        ``cancelled`` in the result. Returns the combined result, or None when
+        a sync is already running.
+        """
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            if not self._stopped.is_set():
+                self._cancel.clear()
+            progress = _Progress(on_progress, self._cancel)
+            result: Dict[str, Any] = {"pushed": 0, "errors": {}, "cancelled": False}
+            if push:
+                progress.event("push")
+                try:
+                    result["pushed"] = storage_sqlite.push_local_changes_to_remote(
+                        progress=progress.for_stage("push")
+                    )
+                except Exception as e:
+                    result["errors"]["push"] = e
+            if pull and not self._cancel.is_set():
+                pulled = pull_all(progress, all_comments)
+                result["errors"].update(pulled.pop("errors"))
+                result.update(pulled)
+            result["cancelled"] = self._cancel.is_set()
+            if not result["cancelled"]:
+                self._adapt(result)
+        finally:
+            self._running.release()
+
+        kind = "sync" if push and pull else ("push" if push else "pull")
+        if callable(self.on_complete):
+            try:
+                self.on_complete(kind, result)
+            except Exception:
+                pass
+        return result
@@ -0,0 +1,262 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from rsportal import storage_sqlite
+
+# matches returned by a search unless asked otherwise
+SEARCH_LIMIT = 20
+# share of a word's trigrams a task must contain to match it when no task
+# contains the word itself (tolerates a typo in longer words)
+FUZZY_OVERLAP = 0.5
+
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize(text: Any) -> str:
+    """Lowercase ``text``, drop accents and collapse punctuation into single spaces."""
+    text = str(text or "").lower()
+    if not text.isascii():
+        text = "".join(
+            ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)
+        )
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _trigrams(word: str) -> Set[str]:
+    return {word[i : i + 3] for i in range(len(word) - 2)}
+
+
+def _prefixes(word: str) -> Set[str]:
+    return {word[:n] for n in (1, 2) if len(word) >= n}
+
+
+class _Entry(NamedTuple):
+    task: Dict[str, Any]
+    # normalized; title and project start with a space so that " word"
+    # is a word-prefix test
+    id: str
+    title: str
+    project: str
+    words: FrozenSet[str]
+
+
+class TaskIndex:
+    """In-memory quick-open index over task ids, titles and projects.
+
+    Tasks are indexed by the words of their normalized ``id title
+    project``; the distinct words (the vocabulary, much smaller than the
+    task list) are in turn indexed by their trigrams and by their first
+    one and two characters. A query word of three or more characters
+    matches every task with a word containing it (the intersection of its
+    trigram posting sets, checked as a substring); shorter words match
+    the start of a word. Every query word must match. When nothing does,
+    words are matched loosely by shared trigrams instead (see
+    FUZZY_OVERLAP). Matches are ranked with id and title prefix matches
+    first.
+
+    The index is filled from sqlite by :meth:`reload` and kept current by
+    :meth:`update`, which ``get_task_index`` registers as a
+    ``storage_sqlite`` task-change listener. It is safe to search from
+    one thread while another updates it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        # word -> task ids; trigram / prefix -> words
+        self._words: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._prefixes: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reload(self) -> None:
+        """Rebuild the index from every stored task."""
+        with self._lock:
+            # read under the lock, so an update committed meanwhile waits
+            # and is applied on top of this snapshot
+            tasks = storage_sqlite.get_task_titles()
+            self._entries, self._words, self._grams, self._prefixes = {}, {}, {}, {}
+            for task in tasks:
+                self._add(task)
+
+    def update(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        """Index new or changed tasks (dicts with ``id``, ``title``, ``project_name``)."""
+        with self._lock:
+            for task in tasks:
+                tid = str(task.get("id") or "")
+                if not tid:
+                    continue
+                old = self._entries.get(tid)
+                if old is not None:
+                    if (old.task["title"], old.task["project_name"]) == (
+                        task.get("title"),
+                        task.get("project_name"),
+                    ):
+                        continue
+                    self._remove(old)
+                self._add(task)
+
+    def remove(self, task_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(str(task_id))
+            if entry is not None:
+                self._remove(entry)
+
+    def _add(self, task: Dict[str, Any]) -> None:
+        tid = str(task["id"])
+        id_norm, title, project = (
+            _normalize(tid),
+            _normalize(task.get("title")),
+            _normalize(task.get("project_name")),
+        )
+        entry = _Entry(
+            task={"id": tid, "title": task.get("title"), "project_name": task.get("project_name")},
+            id=id_norm,
+            title=f" {title}",
+            project=f" {project}",
+            words=frozenset(f"{id_norm} {title} {project}".split()),
+        )
+        self._entries[tid] = entry
+        for word in entry.words:
+            ids = self._words.get(word)
+            if ids is None:
+                ids = self._words[word] = set()
+                for gram in _trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+                for prefix in _prefixes(word):
+                    self._prefixes.setdefault(prefix, set()).add(word)
+            ids.add(tid)
+
+    def _remove(self, entry: _Entry) -> None:
+        tid = entry.task["id"]
+        del self._entries[tid]
+        for word in entry.words:
+            ids = self._words[word]
+            ids.discard(tid)
+            if ids:
+                continue
+            # the last task using this word: drop it from the vocabulary
+            del self._words[word]
+            for postings, keys in ((self._grams, _trigrams(word)), (self._prefixes, _prefixes(word))):
+                for key in keys:
+                    words = postings[key]
+                    words.discard(word)
+                    if not words:
+                        del postings[key]
+
+    def _tasks_with(self, words: Iterable[str]) -> Set[str]:
+        return set().union(*(self._words[w] for w in words))
+
+    def _match(self, word: str) -> Set[str]:
+        if len(word) < 3:
+            return self._tasks_with(self._prefixes.get(word, ()))
+        postings = sorted((self._grams.get(g, set()) for g in _trigrams(word)), key=len)
+        vocab = set(postings[0])
+        for p in postings[1:]:
+            if not vocab:
+                break
+            vocab &= p
+        # sharing every trigram does not make it a substring
+        return self._tasks_with(v for v in vocab if word in v)
+
+    def _similar_words(self, word: str) -> Dict[str, int]:
+        """Words sharing enough of ``word``'s trigrams, with how many they share."""
+        grams = _trigrams(word)
+        need = max(1, math.ceil(len(grams) * FUZZY_OVERLAP))
+        counts: Counter = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        return {v: n for v, n in counts.items() if n >= need}
+
+    def _fuzzy_match(self, word: str) -> Set[str]:
+        if len(word) < 3:
+            return self._tasks_with(self._prefixes.get(word, ()))
+        return self._tasks_with(self._similar_words(word))
+
+    def _candidates(self, words: List[str], match) -> Set[str]:
+        ids: Optional[Set[str]] = None
+        # longest words first: they have the fewest matches
+        for word in sorted(words, key=len, reverse=True):
+            found = match(word)
+            ids = found if ids is None else ids & found
+            if not ids:
+                return set()
+        return ids or set()
+
+    @staticmethod
+    def _score(entry: _Entry, words: List[str], phrase: str) -> float:
+        score = 0.0
+        if entry.id == phrase:
+            score += 1000
+        elif entry.id.startswith(phrase):
+            score += 500
+        if entry.title.startswith(" " + phrase):
+            score += 100
+        for word in words:
+            if " " + word in entry.title:
+                score += 30
+            elif word in entry.title:
+                score += 15
+            elif " " + word in entry.project:
+                score += 10
+            elif word in entry.project or word in entry.id:
+                score += 5
+        # shorter titles break ties
+        return score - len(entry.title) / 1000
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Best matches for ``query`` as dicts with ``id``, ``title`` and ``project_name``."""
+        words = _normalize(query).split()
+        if not words:
+            return []
+        phrase = " ".join(words)
+        score = self._score
+        with self._lock:
+            ids = self._candidates(words, self._match)
+            if ids:
+                key = lambda e: score(e, words, phrase)
+            else:
+                # loose matches: the more trigrams shared, the better
+                ids = self._candidates(words, self._fuzzy_match)
+                similar = [self._similar_words(w) for w in words if len(w) >= 3]
+                key = lambda e: score(e, words, phrase) + sum(
+                    max((shared.get(w, 0) for w in e.words), default=0) for shared in similar
+                )
+            entries = self._entries
+            best = heapq.nlargest(limit, (entries[tid] for tid in ids), key=key)
+            return [dict(e.task) for e in best]
+
+
+_index: Optional[TaskIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_task_index() -> TaskIndex:
+    """Return the process-wide task index, building it from sqlite on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = TaskIndex()
+                # listen first: an upsert committed while reloading is not lost
+                storage_sqlite.add_task_change_listener(index.update)
+                index.reload()
+                _index = index
+    return _index
+
+
+def reset_task_index() -> None:
+    """Drop the shared index (it is rebuilt on next use)."""
+    global _index
+    with _index_lock:
+        if _index is not None:
+            storage_sqlite.remove_task_change_listener(_index.update)
+        _index = None
@@ -0,0 +1,12 @@
+import pytest
+
+from rsportal import storage_sqlite
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A freshly migrated database in a temporary directory."""
+    monkeypatch.setattr(storage_sqlite, "DB_PATH", tmp_path / "rsportal.db")
+    storage_sqlite.migrate()
+    yield storage_sqlite._conn()
+    storage_sqlite.close_connections()
@@ -0,0 +1,42 @@
+"""ApiClient session refresh against a stubbed login and transport."""
+
+from rsportal import api_client
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_concurrent_rejections_log_in_once(db, monkeypatch):
+    logins = []
+
+    def login(session):
+        logins.append(1)
+        session.cookies.set("sessionid", f"fresh-{len(logins)}")
+        return session
+
+    monkeypatch.setattr(api_client, "get_basic_auth", lambda: ("ann", "secret"))
+    monkeypatch.setattr(api_client, "get_authed_session", login)
+    client = api_client.ApiClient(base_url="http://rsportal.test/api/v1")
+    client.auth_mode = "session"
+    client.session.cookies.set("sessionid", "stale")
+
+    sent = []
+
+    def transport(method, url, **kwargs):
+        cookie = client.session.cookies.get("sessionid")
+        sent.append(cookie)
+        if cookie != "stale":
+            return FakeResponse(200)
+        if len(sent) == 1:
+            # a second thread, also sent on the stale session, is rejected
+            # and refreshes it before this one gets to
+            inner = client.get("/tasks")
+            assert inner.status_code == 200
+        return FakeResponse(401)
+
+    monkeypatch.setattr(client.session, "request", transport)
+    assert client.get("/tasks").status_code == 200
+    assert len(logins) == 1
+    assert sent == ["stale", "stale", "fresh-1", "fresh-1"]
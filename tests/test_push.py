@@ -0,0 +1,129 @@
+"""push_local_changes_to_remote against a stubbed API client."""
+
+import pytest
+
+from rsportal import storage_sqlite
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {}
+        self.text = ""
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no body")
+        return self._body
+
+
+class FakeClient:
+    """Records every POST and answers with ``respond(path, payload)``."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.posts = []
+
+    def post(self, path, json=None, headers=None):
+        self.posts.append((path, json))
+        return self.respond(path, json)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    fake = FakeClient(lambda path, payload: FakeResponse(200, []))
+    monkeypatch.setattr(storage_sqlite, "get_client", lambda: fake)
+    return fake
+
+
+def test_server_ids_only_recorded_for_accepted_rows(db, client):
+    ok_id = storage_sqlite.save_time_entry("1", "2024-01-01T09:00:00", "2024-01-01T10:00:00")
+    bad_id = storage_sqlite.save_time_entry("1", "2024-01-02T09:00:00", "2024-01-02T10:00:00")
+    uuids = {
+        r["id"]: r["client_uuid"]
+        for r in db.execute("SELECT id, client_uuid FROM time_entries")
+    }
+
+    def respond(path, payload):
+        return FakeResponse(
+            200,
+            [
+                {"client_uuid": uuids[ok_id], "id": 1000, "status": "created"},
+                {"client_uuid": uuids[bad_id], "id": 1001, "status": "invalid", "error": "bad"},
+            ],
+        )
+
+    client.respond = respond
+    storage_sqlite.push_local_changes_to_remote()
+
+    server_ids = dict(db.execute("SELECT id, server_id FROM time_entries"))
+    assert server_ids == {ok_id: 1000, bad_id: None}
+    assert [d["entity_id"] for d in storage_sqlite.get_dead_letters()] == [str(bad_id)]
+
+
+def test_payloads_leave_out_local_only_columns(db, client):
+    storage_sqlite.upsert_tasks(
+        [
+            {
+                "id": "7",
+                "title": "Write report",
+                "objective": "Q3 numbers",
+                "project": {"name": "Acme"},
+                "assignee": {"username": "ann"},
+                "urgency": "HIGH",
+            }
+        ]
+    )
+    storage_sqlite.save_time_entry("7", "2024-01-01T09:00:00", "2024-01-01T10:00:00")
+    storage_sqlite.save_comment("7", "ann", "done")
+    storage_sqlite.push_local_changes_to_remote()
+
+    sent = {path: payload for path, payload in client.posts}
+    assert set(sent) == {"/tasks/sync", "/time/entries/sync", "/comments/sync"}
+    for payload in sent.values():
+        (rows,) = payload.values()
+        for row in rows:
+            assert not set(row) & set(storage_sqlite._LOCAL_ONLY_COLUMNS), row
+    (task,) = sent["/tasks/sync"]["tasks"]
+    assert task["title"] == "Write report"
+
+
+def test_rows_are_sent_with_their_server_id(db, client):
+    old_id = storage_sqlite.save_time_entry("1", "2024-01-01T09:00:00", "2024-01-01T10:00:00")
+    # pushed earlier; the server calls it 900
+    db.execute("UPDATE time_entries SET server_id = 900, synced = 1 WHERE id = ?", (old_id,))
+    db.execute("DELETE FROM outbox")
+    db.commit()
+    new_id = storage_sqlite.save_time_entry("1", "2024-01-02T09:00:00", None)
+    storage_sqlite.update_time_entry(old_id, "2024-01-01T09:00:00", "2024-01-01T11:00:00", "")
+
+    def respond(path, payload):
+        # per-item results identify rows by the id they were sent with
+        return FakeResponse(200, [{"id": 900, "status": "invalid", "error": "locked"}])
+
+    client.respond = respond
+    storage_sqlite.push_local_changes_to_remote()
+
+    uuids = dict(db.execute("SELECT id, client_uuid FROM time_entries"))
+    ((path, payload),) = client.posts
+    sent = {r["client_uuid"]: r for r in payload["time_entries"]}
+    assert sent[uuids[old_id]]["id"] == 900
+    assert "id" not in sent[uuids[new_id]]
+    assert all("server_id" not in r for r in sent.values())
+    assert [d["entity_id"] for d in storage_sqlite.get_dead_letters()] == [str(old_id)]
+    assert dict(db.execute("SELECT id, synced FROM time_entries")) == {old_id: 0, new_id: 1}
+
+
+def test_ack_replaces_a_pulled_copy_of_the_pushed_row(db, client):
+    local_id = storage_sqlite.save_comment("1", "ann", "done")
+    (uuid,) = db.execute("SELECT client_uuid FROM comments").fetchone()
+    # pulled before the push was acknowledged, without its client_uuid
+    storage_sqlite.upsert_comments(
+        [{"id": 1000, "task_id": "1", "author": "ann", "comment": "done", "synced": True}]
+    )
+    client.respond = lambda path, payload: FakeResponse(200, [{"client_uuid": uuid, "id": 1000}])
+    assert storage_sqlite.push_local_changes_to_remote() == 1
+
+    rows = [tuple(r) for r in db.execute("SELECT id, server_id, synced FROM comments")]
+    assert rows == [(local_id, 1000, 1)]
@@ -0,0 +1,143 @@
+"""The hot queries must be answered from their indexes (EXPLAIN QUERY PLAN)."""
+
+import pytest
+
+from rsportal import storage_sqlite
+
+# the query TaskDetailWindow.load_comments runs
+COMMENTS_SQL = (
+    "SELECT id, author, comment, created_at FROM comments WHERE task_id = ? ORDER BY created_at ASC"
+)
+
+
+def query_plan(conn, sql, params=()):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def traced_plans(conn, fn, *args, **kwargs):
+    """Run ``fn`` and return the plan of every SELECT / UPDATE it executed."""
+    statements = []
+    conns = (storage_sqlite._conn(), storage_sqlite._read_conn())
+    for c in conns:
+        c.set_trace_callback(statements.append)
+    try:
+        fn(*args, **kwargs)
+    finally:
+        for c in conns:
+            c.set_trace_callback(None)
+    plans = [
+        (sql, query_plan(conn, sql))
+        for sql in statements
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE"))
+    ]
+    assert plans, f"{fn.__name__} ran no queries"
+    return plans
+
+
+def assert_uses(plans, index):
+    for sql, plan in plans:
+        assert any(index in step for step in plan), (sql, plan)
+        assert not any("TEMP B-TREE" in step for step in plan), (sql, plan)
+
+
+def test_time_entries_by_task(db):
+    plans = traced_plans(db, storage_sqlite.get_time_entries, "1")
+    assert_uses(plans, "idx_time_entries_task_start")
+
+
+def test_comments_by_task(db):
+    assert_uses([(COMMENTS_SQL, query_plan(db, COMMENTS_SQL, ("1",)))], "idx_comments_task_created")
+
+
+def test_tasks_by_status(db):
+    plans = traced_plans(db, storage_sqlite.get_tasks, status="TODO")
+    assert_uses(plans, "idx_tasks_status_updated_id")
+
+
+def test_running_entries(db):
+    assert_uses(traced_plans(db, storage_sqlite.get_running_entries), "idx_time_entries_running")
+
+
+@pytest.mark.parametrize("task_id", [None, "1"])
+def test_stop_running_entries(db, task_id):
+    plans = traced_plans(db, storage_sqlite.stop_running_entries_and_get, task_id)
+    # the UPDATE itself goes by primary key
+    selects = [(sql, plan) for sql, plan in plans if sql.lstrip().upper().startswith("SELECT")]
+    assert_uses(selects, "idx_time_entries_running")
+
+
+# sort key -> the (column, id) index its pages scan
+SORT_INDEXES = {
+    "title": "idx_tasks_title_id",
+    "project": "idx_tasks_project_id",
+    "category": "idx_tasks_category_id",
+    "status": "idx_tasks_status_id",
+    "deadline": "idx_tasks_deadline_id",
+    "assignee": "idx_tasks_assignee_id",
+    "urgency": "idx_tasks_urgency_id",
+    "updated_at": "idx_tasks_updated_id",
+}
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_INDEXES))
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize(
+    "cursor",
+    [{}, {"after": ("x", "5")}, {"before": ("x", "5")}, {"after": (None, "5")}],
+)
+def test_task_page(db, sort, descending, cursor):
+    plans = traced_plans(
+        db, storage_sqlite.get_task_page, sort=sort, descending=descending, **cursor
+    )
+    assert_uses(plans, SORT_INDEXES[sort])
+
+
+# filter -> the (column, updated_at, id) index the default order pages on
+FILTER_INDEXES = {
+    "status": "idx_tasks_status_updated_id",
+    "project": "idx_tasks_project_updated_id",
+    "assignee": "idx_tasks_assignee_updated_id",
+}
+
+
+def _fill_tasks(n=300):
+    storage_sqlite.upsert_tasks(
+        [
+            {
+                "id": str(i),
+                "title": f"Task {i}",
+                "status": ("TODO", "IN_PROGRESS", "COMPLETED")[i % 3],
+                "project": {"name": f"Project {i % 7}"},
+                "assignee": {"username": f"user{i % 5}"},
+                "updated_at": f"2024-01-{i % 28 + 1:02d}T00:00:00",
+            }
+            for i in range(n)
+        ]
+    )
+
+
+@pytest.mark.parametrize("analyzed", [False, True])
+@pytest.mark.parametrize("key", sorted(FILTER_INDEXES))
+@pytest.mark.parametrize("cursor", [{}, {"after": ("2024-01-01", "5")}, {"before": ("2024-01-01", "5")}])
+def test_filtered_task_page(db, key, cursor, analyzed):
+    if analyzed:
+        # with statistics the planner must still prefer the covering order
+        _fill_tasks()
+        db.execute("ANALYZE")
+        db.commit()
+    value = {"status": "TODO", "project": "Project 1", "assignee": "user1"}[key]
+    plans = traced_plans(db, storage_sqlite.get_task_page, {key: value}, **cursor)
+    assert_uses(plans, FILTER_INDEXES[key])
+
+
+@pytest.mark.parametrize("cursor", [{}, {"after": (None, "5")}, {"before": (None, "5")}])
+def test_task_page_by_id(db, cursor):
+    plans = traced_plans(db, storage_sqlite.get_task_page, sort="id", **cursor)
+    for sql, plan in plans:
+        assert not any("TEMP B-TREE" in step for step in plan), (sql, plan)
+        assert not any(step.startswith("SCAN tasks") and "INDEX" not in step for step in plan), (sql, plan)
+
+
+def test_unused_unsynced_indexes_are_dropped(db):
+    names = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert not {n for n in names if n.endswith("_unsynced")}
@@ -0,0 +1,139 @@
+"""SyncScheduler and pull_all with the network stubbed out."""
+
+import threading
+
+import pytest
+
+from rsportal import sync
+
+
+@pytest.fixture
+def signed_in(monkeypatch):
+    monkeypatch.setattr(sync, "_has_credentials", lambda: True)
+
+
+def test_loop_survives_a_failing_sync(monkeypatch, signed_in):
+    scheduler = sync.SyncScheduler(interval=60, min_interval=0, max_interval=3600)
+    calls = []
+    second = threading.Event()
+
+    def run_once(pull=True):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        scheduler._stopped.set()
+        second.set()
+
+    monkeypatch.setattr(scheduler, "run_once", run_once)
+    # no real waiting between the two syncs
+    monkeypatch.setattr(scheduler, "_jittered", lambda seconds: 0)
+    thread = threading.Thread(target=scheduler._loop, daemon=True)
+    thread.start()
+    assert second.wait(5)
+    thread.join(5)
+
+    assert len(calls) == 2
+    assert scheduler._current == 60 * sync.OFFLINE_BACKOFF
+    assert scheduler.last_error is None
+
+
+def test_failing_sync_is_recorded(monkeypatch, signed_in):
+    scheduler = sync.SyncScheduler(interval=60, min_interval=0)
+    error = RuntimeError("boom")
+
+    def run_once(pull=True):
+        scheduler._stopped.set()
+        raise error
+
+    monkeypatch.setattr(scheduler, "run_once", run_once)
+    scheduler._loop()
+    assert scheduler.last_error is error
+
+
+def test_local_change_only_pushes(monkeypatch, signed_in):
+    scheduler = sync.SyncScheduler(interval=60, min_interval=0)
+    monkeypatch.setattr(sync, "LOCAL_CHANGE_DELAY", 0)
+    due = scheduler._due = sync.time.monotonic() + 3600
+    calls = []
+
+    def run_once(pull=True):
+        calls.append(pull)
+        scheduler._stopped.set()
+        return {}
+
+    monkeypatch.setattr(scheduler, "run_once", run_once)
+    scheduler.notify_local_change()
+    scheduler._loop()
+    assert calls == [False]
+    # the next full sync keeps its time
+    assert scheduler._due == due
+
+
+def test_no_sync_without_credentials(monkeypatch):
+    scheduler = sync.SyncScheduler(interval=60, min_interval=0)
+    monkeypatch.setattr(sync, "_has_credentials", lambda: False)
+    calls = []
+    monkeypatch.setattr(scheduler, "run_once", lambda pull=True: calls.append(pull))
+
+    def jittered(seconds):
+        scheduler._stopped.set()
+        return seconds
+
+    monkeypatch.setattr(scheduler, "_jittered", jittered)
+    scheduler._loop()
+    assert calls == []
+
+
+def _stub_pull(monkeypatch, pulled_tasks, requested):
+    def pull_tasks(write, progress):
+        write(sync.storage_sqlite.upsert_tasks, pulled_tasks)
+
+    def refresh_all_comments_from_remote(task_ids, write=None, progress=None):
+        requested.extend(task_ids)
+        return 0, {}
+
+    monkeypatch.setattr(sync.storage_sqlite, "pull_tasks", pull_tasks)
+    monkeypatch.setattr(sync.storage_sqlite, "pull_time_entries", lambda write, progress: None)
+    monkeypatch.setattr(
+        sync.storage_sqlite, "refresh_all_comments_from_remote", refresh_all_comments_from_remote
+    )
+
+
+def test_pull_all_fetches_comments_for_pulled_tasks_only(db, monkeypatch):
+    sync.storage_sqlite.upsert_tasks([{"id": "T-1", "title": "stored"}])
+    requested = []
+    _stub_pull(monkeypatch, [{"id": "T-2", "title": "changed"}], requested)
+
+    result = sync.pull_all()
+
+    assert result["errors"] == {}
+    assert requested == ["T-2"]
+
+
+def test_pull_all_fetches_comments_for_stored_and_new_tasks(db, monkeypatch):
+    sync.storage_sqlite.upsert_tasks([{"id": "T-1", "title": "stored"}])
+    requested = []
+    _stub_pull(monkeypatch, [{"id": "T-2", "title": "new"}], requested)
+
+    result = sync.pull_all(all_comments=True)
+
+    assert result["errors"] == {}
+    assert result["tasks"] == 1
+    assert sync.storage_sqlite.get_task("T-2") is not None
+    assert sorted(requested) == ["T-1", "T-2"]
+
+
+def test_pull_all_survives_a_failing_id_read(db, monkeypatch):
+    requested = []
+    _stub_pull(monkeypatch, [{"id": "1", "title": "new"}], requested)
+
+    def broken():
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(sync.storage_sqlite, "get_task_ids", broken)
+
+    result = sync.pull_all(all_comments=True)
+
+    assert isinstance(result["errors"].get("comments"), RuntimeError)
+    # the other stages still ran
+    assert sync.storage_sqlite.get_task("1") is not None
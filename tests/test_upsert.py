@@ -0,0 +1,98 @@
+"""Change counts from the bulk upserts, with the schema's triggers installed."""
+
+from rsportal import storage_sqlite
+
+
+def _tasks(n, title="Task"):
+    return [{"id": str(i), "title": f"{title} {i}", "objective": "obj"} for i in range(n)]
+
+
+def test_counts_exclude_trigger_writes(db):
+    # the outbox and full-text search triggers fire on every write below
+    assert db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks'"
+    ).fetchone()[0]
+
+    assert storage_sqlite.upsert_tasks(_tasks(5)) == {"inserted": 5, "updated": 0, "unchanged": 0}
+    assert storage_sqlite.upsert_tasks(_tasks(5)) == {"inserted": 0, "updated": 0, "unchanged": 5}
+
+    changed = _tasks(5)
+    changed[2]["title"] = "Renamed"
+    assert storage_sqlite.upsert_tasks(changed) == {"inserted": 0, "updated": 1, "unchanged": 4}
+    assert [r["id"] for r in storage_sqlite.search_tasks("renamed")] == ["2"]
+
+
+def test_comment_counts_exclude_trigger_writes(db):
+    comments = [{"id": i, "task_id": "1", "author": "ann", "comment": f"note {i}"} for i in range(1, 4)]
+    assert storage_sqlite.upsert_comments(comments) == {"inserted": 3, "updated": 0, "unchanged": 0}
+    comments[0]["comment"] = "edited"
+    assert storage_sqlite.upsert_comments(comments) == {"inserted": 0, "updated": 1, "unchanged": 2}
+
+
+def test_status_change_journals_only_the_status(db):
+    storage_sqlite.upsert_tasks(
+        [{"id": "1", "title": "Old title", "deadline": "2024-01-01", "status": "TODO", "synced": True}]
+    )
+    # a pull updates the task while a detail window still shows the old row
+    storage_sqlite.upsert_tasks(
+        [{"id": "1", "title": "New title", "deadline": "2024-02-01", "status": "TODO", "synced": True}]
+    )
+    storage_sqlite.update_task_status("1", "IN_PROGRESS")
+
+    task = storage_sqlite.get_task("1")
+    assert (task["title"], task["deadline"], task["status"]) == ("New title", "2024-02-01", "IN_PROGRESS")
+    fields = [r[0] for r in db.execute("SELECT fields FROM outbox WHERE entity = 'tasks'")]
+    assert fields == ['["status"]']
+
+
+def _pulled_entry(server_id, **fields):
+    return {"id": server_id, "task_id": "1", "start_time": "2024-01-01T09:00:00", "synced": True, **fields}
+
+
+def test_pulled_entry_never_overwrites_a_local_row(db):
+    local_id = storage_sqlite.save_time_entry("1", "2024-03-01T09:00:00", "2024-03-01T17:00:00", "mine")
+    # the server's entry happens to have the same id as the unpushed local one
+    counts = storage_sqlite.upsert_time_entries([_pulled_entry(local_id, notes="theirs")])
+    assert counts == {"inserted": 1, "updated": 0, "unchanged": 0}
+
+    rows = {r["notes"]: dict(r) for r in db.execute("SELECT * FROM time_entries")}
+    assert rows["mine"]["id"] == local_id
+    assert (rows["mine"]["synced"], rows["mine"]["server_id"]) == (0, None)
+    assert rows["theirs"]["id"] != local_id
+    assert rows["theirs"]["server_id"] == local_id
+
+    # pulled again, it updates the same row
+    counts = storage_sqlite.upsert_time_entries([_pulled_entry(local_id, notes="theirs, edited")])
+    assert counts == {"inserted": 0, "updated": 1, "unchanged": 0}
+    assert db.execute("SELECT COUNT(*) FROM time_entries").fetchone()[0] == 2
+
+
+def test_pulled_entry_claims_its_local_row_by_client_uuid(db):
+    local_id = storage_sqlite.save_time_entry("1", "2024-03-01T09:00:00", None)
+    (uuid,) = db.execute("SELECT client_uuid FROM time_entries WHERE id = ?", (local_id,)).fetchone()
+
+    storage_sqlite.upsert_time_entries([_pulled_entry(500, client_uuid=uuid, notes="pushed")])
+
+    rows = [dict(r) for r in db.execute("SELECT id, server_id, notes FROM time_entries")]
+    assert rows == [{"id": local_id, "server_id": 500, "notes": "pushed"}]
+
+
+def test_pulled_comment_never_overwrites_a_local_row(db):
+    local_id = storage_sqlite.save_comment("1", "ann", "mine")
+    storage_sqlite.upsert_comments(
+        [{"id": local_id, "task_id": "1", "author": "bob", "comment": "theirs", "synced": True}]
+    )
+    rows = dict(db.execute("SELECT comment, id FROM comments"))
+    assert rows["mine"] == local_id
+    assert rows["theirs"] != local_id
+
+
+def test_pulled_entry_with_client_uuid_replaces_an_earlier_copy(db):
+    local_id = storage_sqlite.save_time_entry("1", "2024-03-01T09:00:00", None)
+    (uuid,) = db.execute("SELECT client_uuid FROM time_entries").fetchone()
+    # first pulled without its client_uuid, then with it
+    storage_sqlite.upsert_time_entries([_pulled_entry(500)])
+    storage_sqlite.upsert_time_entries([_pulled_entry(500, client_uuid=uuid)])
+
+    rows = [tuple(r) for r in db.execute("SELECT id, server_id FROM time_entries")]
+    assert rows == [(local_id, 500)]
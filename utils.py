@@ -74,11 +74,12 @@ def get_basic_auth():
     return username, password
 
 
-def get_authed_session():
+def get_authed_session(session=None):
     """Create a requests.Session authenticated via Django/DRF SessionAuth.
 
     Logs in via Django's login view at BASE_URL/accounts/login/ using CSRF,
     then returns a session with cookies set. Returns None on failure.
+    Pass ``session`` to log in on an existing (e.g. pooled) session instead.
     """
     try:
         import requests
@@ -92,7 +93,7 @@ def get_authed_session():
     api_base = get_api_base()
     site_base = api_base.rsplit("/api/v1", 1)[0]
     login_url = f"{site_base}/accounts/login/"
-    s = requests.Session()
+    s = session if session is not None else requests.Session()
     try:
         # 1) GET login page to obtain CSRF cookie
         r1 = s.get(login_url, timeout=15)